@@ -3,11 +3,11 @@ import pathlib
 import sys
 from logging.config import fileConfig
 
-from sqlmodel import SQLModel, create_engine
-from sqlmodel.ext.asyncio.session import AsyncEngine
+from sqlmodel import SQLModel
 
 from alembic import context
 from app.core.config import settings
+from app.db.session import create_db_engine
 
 sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
 
@@ -83,11 +83,13 @@ async def run_migrations_online() -> None:
 
     """
 
-    connectable = AsyncEngine(create_engine(settings.ASYNC_DB_URI, echo=True, future=True))
+    connectable = create_db_engine(pooled=False)
 
     async with connectable.connect() as connection:
         await connection.run_sync(do_run_migrations)
 
+    await connectable.dispose()
+
     # connectable = engine_from_config(
     #     config.get_section(config.config_ini_section),
     #     prefix="sqlalchemy.",
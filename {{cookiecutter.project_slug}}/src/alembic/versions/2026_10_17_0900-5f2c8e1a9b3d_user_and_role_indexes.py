@@ -0,0 +1,75 @@
+"""User and Role indexes from the CRUD query patterns
+
+Drops the indexes no query uses: `id` already has the primary key index and
+`hashed_password` is never filtered on. Replaces the exact `email` index by a
+unique one on `lower(email)`, which `get_by_email` (login, register) matches
+on; the upgrade fails if two users only differ by the case of their email.
+Adds `(created_at, id)` for the lists ordered by creation date, `role_id` for
+`Role.users` and the foreign key check of role deletes, and `Role.name` for
+`get_role_by_name`.
+
+Indexes are built and dropped CONCURRENTLY, outside a transaction, so the
+tables stay writable. Databases whose tables are created by a later revision
+get these indexes from the models, so the upgrade does nothing there.
+
+Revision ID: 5f2c8e1a9b3d
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5f2c8e1a9b3d"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+OBSOLETE_INDEXES = ["ix_User_id", "ix_Role_id", "ix_User_hashed_password", "ix_User_email"]
+INDEXES = {
+    "ix_User_email_lower": 'CREATE UNIQUE INDEX {} ON "User" (lower(email))',
+    "ix_User_created_at_id": 'CREATE INDEX {} ON "User" (created_at, id)',
+    "ix_User_role_id": 'CREATE INDEX {} ON "User" (role_id)',
+    "ix_Role_name": 'CREATE INDEX {} ON "Role" (name)',
+}
+PREVIOUS_INDEXES = {
+    "ix_User_id": 'CREATE INDEX {} ON "User" (id)',
+    "ix_Role_id": 'CREATE INDEX {} ON "Role" (id)',
+    "ix_User_hashed_password": 'CREATE INDEX {} ON "User" (hashed_password)',
+    "ix_User_email": 'CREATE UNIQUE INDEX {} ON "User" (email)',
+}
+
+
+def _tables_exist() -> bool:
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    return "User" in tables and "Role" in tables
+
+
+def _create(indexes: dict[str, str]) -> None:
+    for name, statement in indexes.items():
+        # A failed concurrent build leaves an invalid index behind, drop it first
+        op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+        op.execute(statement.format(f'CONCURRENTLY "{name}"'))
+
+
+def _drop(names: list[str]) -> None:
+    for name in names:
+        op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+def upgrade() -> None:
+    if not _tables_exist():
+        return
+    with op.get_context().autocommit_block():
+        _create(INDEXES)
+        _drop(OBSOLETE_INDEXES)
+
+
+def downgrade() -> None:
+    if not _tables_exist():
+        return
+    with op.get_context().autocommit_block():
+        _create(PREVIOUS_INDEXES)
+        _drop(list(INDEXES))
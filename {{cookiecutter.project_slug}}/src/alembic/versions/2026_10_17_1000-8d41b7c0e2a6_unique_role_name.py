@@ -0,0 +1,44 @@
+"""Unique role names
+
+The role endpoints already reject a name in use; the unique index makes it
+hold under concurrency too and lets `init_db` upsert roles on their name. The
+upgrade fails if two roles share a name.
+
+The unique index is built CONCURRENTLY next to the plain one, which is then
+dropped, so the table stays writable.
+
+Revision ID: 8d41b7c0e2a6
+Revises: 5f2c8e1a9b3d
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8d41b7c0e2a6"
+down_revision = "5f2c8e1a9b3d"
+branch_labels = None
+depends_on = None
+
+
+def _swap_role_name_index(unique: bool) -> None:
+    if "Role" not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS "ix_Role_name_new"')
+        op.execute(
+            f'CREATE {"UNIQUE " if unique else ""}INDEX CONCURRENTLY "ix_Role_name_new" '
+            'ON "Role" (name)'
+        )
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS "ix_Role_name"')
+        op.execute('ALTER INDEX "ix_Role_name_new" RENAME TO "ix_Role_name"')
+
+
+def upgrade() -> None:
+    _swap_role_name_index(unique=True)
+
+
+def downgrade() -> None:
+    _swap_role_name_index(unique=False)
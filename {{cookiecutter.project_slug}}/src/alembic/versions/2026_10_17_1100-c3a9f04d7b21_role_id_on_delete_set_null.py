@@ -0,0 +1,42 @@
+"""User.role_id ON DELETE SET NULL
+
+Deleting a role used to load all of its users to unset their role_id before
+the DELETE. The foreign key now does it in the database, so a role is removed
+with a single DELETE whatever the number of its users.
+
+The constraint is added NOT VALID and validated afterwards, which does not
+block writes to "User" while the existing rows are checked.
+
+Revision ID: c3a9f04d7b21
+Revises: 8d41b7c0e2a6
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c3a9f04d7b21"
+down_revision = "8d41b7c0e2a6"
+branch_labels = None
+depends_on = None
+
+
+def _replace_role_id_foreign_key(on_delete: str) -> None:
+    if "User" not in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.execute('ALTER TABLE "User" DROP CONSTRAINT IF EXISTS "User_role_id_fkey"')
+    op.execute(
+        'ALTER TABLE "User" ADD CONSTRAINT "User_role_id_fkey" FOREIGN KEY (role_id) '
+        f'REFERENCES "Role" (id) {on_delete} NOT VALID'
+    )
+    op.execute('ALTER TABLE "User" VALIDATE CONSTRAINT "User_role_id_fkey"')
+
+
+def upgrade() -> None:
+    _replace_role_id_foreign_key("ON DELETE SET NULL")
+
+
+def downgrade() -> None:
+    _replace_role_id_foreign_key("")
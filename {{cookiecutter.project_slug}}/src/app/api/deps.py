@@ -1,8 +1,7 @@
 from collections.abc import AsyncGenerator
 from typing import Callable
 
-import redis.asyncio as aioredis
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt import DecodeError, ExpiredSignatureError, MissingRequiredClaimError
 from loguru import logger
@@ -16,7 +15,9 @@ from app.core.security import decode_token
 from app.db.session import SessionLocal
 from app.models.user_model import User
 from app.schemas.common_schema import IMetaGeneral, TokenType
-from app.utils.token import get_valid_tokens
+from app.utils.principal_cache import principal_cache
+from app.utils.role_catalog import role_catalog
+from app.utils.token import is_token_valid
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_PREFIX}/auth/token",
@@ -24,15 +25,8 @@ reusable_oauth2 = OAuth2PasswordBearer(
 )
 
 
-async def get_redis_client() -> Redis:
-    redis = await aioredis.from_url(
-        f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}",
-        password=settings.REDIS_PASSWORD,
-        max_connections=10,
-        encoding="utf8",
-        decode_responses=True,
-    )
-    return redis
+async def get_redis_client(request: Request) -> Redis:
+    return request.app.state.redis
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -51,8 +45,7 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 
 
 async def get_general_meta() -> IMetaGeneral:
-    current_roles = await crud.role.get_multi(skip=0, limit=100)
-    return IMetaGeneral(roles=current_roles)
+    return IMetaGeneral(roles=role_catalog.get_all())
 
 
 def get_current_user(required_roles: list[str] = None) -> Callable[[], User]:
@@ -80,16 +73,18 @@ def get_current_user(required_roles: list[str] = None) -> Callable[[], User]:
                 detail="There is no required field in your token. Please contact the administrator.",
             )
 
-        user_id = payload["sub"]
-        valid_access_tokens = await get_valid_tokens(redis_client, user_id, TokenType.ACCESS)
-        if valid_access_tokens and access_token not in valid_access_tokens:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Could not validate credentials",
-            )
-        user: User = await crud.user.get(id=user_id)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
+        user = principal_cache.get(access_token)
+        if user is None:
+            user_id = payload["sub"]
+            if not await is_token_valid(redis_client, user_id, access_token, TokenType.ACCESS):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Could not validate credentials",
+                )
+            user: User = await crud.user.get(id=user_id, load_profile="with_role")
+            if not user:
+                raise HTTPException(status_code=404, detail="User not found")
+            principal_cache.set(access_token, user)
 
         if not user.is_active:
             raise HTTPException(status_code=400, detail="Inactive user")
@@ -97,7 +92,8 @@ def get_current_user(required_roles: list[str] = None) -> Callable[[], User]:
         if required_roles:
             is_valid_role = False
             for role in required_roles:
-                if role == user.role.name:
+                # Users lose their role when it is deleted
+                if user.role is not None and role == user.role.name:
                     is_valid_role = True
 
             if not is_valid_role:
@@ -0,0 +1,100 @@
+import asyncio
+from collections.abc import Callable
+from typing import Any
+from uuid import UUID
+
+import orjson
+from fastapi import Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, ValidationError
+from starlette.routing import request_response
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    # orjson only knows `uuid.UUID` itself, not subclasses such as the uuid7 ids
+    # of objects that were created in this request
+    if isinstance(obj, UUID):
+        return str(obj)
+    raise TypeError
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson.
+
+    UUID, datetime, enum and pydantic models are serialized natively, without
+    going through `jsonable_encoder` first.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONRoute(APIRoute):
+    """Route that validates an endpoint result against its response model once.
+
+    Only active when the route renders a `FastJSONResponse` (usually as the
+    app's `default_response_class`): the validated model is dumped straight to
+    the response, skipping FastAPI's extra `jsonable_encoder` pass, and results
+    that already are an instance of the response model (e.g.
+    `IGetResponsePaginated` pages) are not validated again. Status code and
+    headers set on an injected `Response` parameter are kept.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, endpoint, **kwargs)
+        response_class = self.response_class
+        if isinstance(response_class, DefaultPlaceholder):
+            response_class = response_class.value
+
+        if self.response_field is not None and issubclass(response_class, FastJSONResponse):
+            self.dependant.call = self._render_with(response_class, self.dependant.call)
+            self.app = request_response(self.get_route_handler())
+
+    def _render_with(
+        self, response_class: type[FastJSONResponse], call: Callable[..., Any]
+    ) -> Callable[..., Any]:
+        is_coroutine = asyncio.iscoroutinefunction(call)
+        response_param_name = self.dependant.response_param_name
+        response_type = self.response_field.type_
+        field = self.secure_cloned_response_field
+        response_args = {} if self.status_code is None else {"status_code": self.status_code}
+        dict_options = {
+            "include": self.response_model_include,
+            "exclude": self.response_model_exclude,
+            "by_alias": self.response_model_by_alias,
+            "exclude_unset": self.response_model_exclude_unset,
+            "exclude_defaults": self.response_model_exclude_defaults,
+            "exclude_none": self.response_model_exclude_none,
+        }
+
+        async def endpoint(**values: Any) -> Any:
+            if is_coroutine:
+                content = await call(**values)
+            else:
+                content = await run_in_threadpool(call, **values)
+            if isinstance(content, Response):
+                return content
+
+            if type(content) is not response_type:
+                content, errors = field.validate(content, {}, loc=("response",))
+                if errors:
+                    raise ValidationError(
+                        errors if isinstance(errors, list) else [errors], field.type_
+                    )
+            if isinstance(content, BaseModel):
+                content = content.dict(**dict_options)
+            response = response_class(content, **response_args)
+
+            sub_response = values.get(response_param_name) if response_param_name else None
+            if sub_response is not None:
+                if sub_response.status_code:
+                    response.status_code = sub_response.status_code
+                response.headers.raw.extend(sub_response.headers.raw)
+            return response
+
+        return endpoint
@@ -8,10 +8,11 @@ from redis.asyncio import Redis
 
 from app import crud
 from app.api import deps
+from app.api.responses import FastJSONRoute
 from app.core import security
 from app.core.config import settings
-from app.core.security import decode_token, get_password_hash, verify_password
-from app.deps import user_deps
+from app.core.query_audit import query_budget
+from app.core.security import decode_token, get_password_hash_async, verify_password_async
 from app.models.user_model import User
 from app.schemas.auth_schema import (
     IAuthChangePassword,
@@ -20,14 +21,17 @@ from app.schemas.auth_schema import (
 )
 from app.schemas.common_schema import IMetaGeneral, TokenType
 from app.schemas.response_schema import IPostResponseBase, create_response
+from app.schemas.role_schema import IRoleEnum
 from app.schemas.token_schema import RefreshToken, Token, TokenRead
 from app.schemas.user_schema import IUserCreate, IUserRead
-from app.utils.token import add_token_to_redis, delete_tokens, get_valid_tokens
+from app.utils.role_catalog import role_catalog
+from app.utils.token import refresh_access_token, store_tokens
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.post("/login")
+@query_budget(1)
 async def login(
     login_user: IAuthLogin,
     meta_data: IMetaGeneral = Depends(deps.get_general_meta),
@@ -61,31 +65,20 @@ async def login(
         user=user,
     )
 
-    valid_access_tokens = await get_valid_tokens(redis_client, user.id, TokenType.ACCESS)
-    if valid_access_tokens:
-        await add_token_to_redis(
-            redis_client,
-            user,
-            access_token,
-            TokenType.ACCESS,
-            settings.ACCESS_TOKEN_EXPIRE_MINUTES,
-        )
-    valid_refresh_tokens = await get_valid_tokens(redis_client, user.id, TokenType.REFRESH)
-    if valid_refresh_tokens:
-        await add_token_to_redis(
-            redis_client,
-            user,
-            refresh_token,
-            TokenType.REFRESH,
-            settings.REFRESH_TOKEN_EXPIRE_MINUTES,
-        )
+    await store_tokens(
+        redis_client,
+        user.id,
+        {TokenType.ACCESS: access_token, TokenType.REFRESH: refresh_token},
+        only_if_tracked=True,
+    )
 
-    logger.info(f"User '{user.email}' successful loggined")
+    logger.info("User '{}' logged in", user.id)
 
     return create_response(meta=meta_data, data=data, message="Login correctly")
 
 
 @router.post("/register", status_code=status.HTTP_201_CREATED)
+@query_budget(1)
 async def register(
     register_user: IAuthRegister,
 ) -> IPostResponseBase[IUserRead]:
@@ -100,7 +93,6 @@ async def register(
     Raises:
       - `HTTPException`: If the user already exists.
     """
-    register_user = await user_deps.user_exists(user=register_user)
     new_user = IUserCreate(
         first_name="",
         last_name="",
@@ -111,14 +103,14 @@ async def register(
         is_superuser=False,
     )
 
-    role = await crud.role.get_role_by_name(name="user")
+    role = role_catalog.get_by_name(IRoleEnum.user)
     if not role:
         new_user.role_id = None
     else:
         new_user.role_id = role.id
 
     user = await crud.user.create_with_role(obj_in=new_user)
-    logger.info(f"User '{user.email}' registered")
+    logger.info("User '{}' registered", user.id)
 
     return create_response(data=user)
 
@@ -148,15 +140,9 @@ async def login_access_token(
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(user.id, expires_delta=access_token_expires)
-    valid_access_tokens = await get_valid_tokens(redis_client, user.id, TokenType.ACCESS)
-    if valid_access_tokens:
-        await add_token_to_redis(
-            redis_client,
-            user,
-            access_token,
-            TokenType.ACCESS,
-            settings.ACCESS_TOKEN_EXPIRE_MINUTES,
-        )
+    await store_tokens(
+        redis_client, user.id, {TokenType.ACCESS: access_token}, only_if_tracked=True
+    )
 
     return TokenRead(access_token=access_token, token_type="bearer")
 
@@ -199,25 +185,16 @@ async def get_new_access_token(
 
     if payload["type"] == "refresh":
         user_id = payload["sub"]
-        valid_refresh_tokens = await get_valid_tokens(redis_client, user_id, TokenType.REFRESH)
-        if valid_refresh_tokens and body.refresh_token not in valid_refresh_tokens:
-            raise HTTPException(status_code=403, detail="Refresh token invalid")
-
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        user = await crud.user.get(id=user_id)
+        user = await crud.user.get(id=user_id, load_profile="without_role")
         if user.is_active:
             access_token = security.create_access_token(
                 user.id, expires_delta=access_token_expires
             )
-            valid_access_tokens = await get_valid_tokens(redis_client, user.id, TokenType.ACCESS)
-            if valid_access_tokens:
-                await add_token_to_redis(
-                    redis_client,
-                    user,
-                    access_token,
-                    TokenType.ACCESS,
-                    settings.ACCESS_TOKEN_EXPIRE_MINUTES,
-                )
+            if not await refresh_access_token(
+                redis_client, user_id, body.refresh_token, access_token
+            ):
+                raise HTTPException(status_code=403, detail="Refresh token invalid")
             return create_response(
                 data=TokenRead(access_token=access_token, token_type="bearer"),
                 message="Access token generated correctly",
@@ -245,20 +222,18 @@ async def change_password(
     Raises:
       - `HTTPException`: If the current password is invalid or if the new password is the same as the current password.
     """
-    if not verify_password(password.current_password, current_user.hashed_password):
+    if not await verify_password_async(password.current_password, current_user.hashed_password):
         raise HTTPException(status_code=400, detail="Invalid Current Password")
 
-    if verify_password(password.new_password, current_user.hashed_password):
+    if await verify_password_async(password.new_password, current_user.hashed_password):
         raise HTTPException(
             status_code=400,
             detail="New Password should be different that the current one",
         )
 
-    # Update the user's password in the database
-    new_hashed_password = get_password_hash(password.new_password)
-    await crud.user.update(
-        obj_current=current_user, obj_new={"hashed_password": new_hashed_password}
-    )
+    # Update the user's password in the database, store_tokens below invalidates the user
+    new_hashed_password = await get_password_hash_async(password.new_password)
+    await crud.user.update_password(user=current_user, hashed_password=new_hashed_password)
 
     # Create new access and refresh tokens
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -276,26 +251,14 @@ async def change_password(
         user=current_user,
     )
 
-    # Delete any existing access and refresh tokens for the user
-    await delete_tokens(redis_client, current_user, TokenType.ACCESS)
-    await delete_tokens(redis_client, current_user, TokenType.REFRESH)
-
-    # Add the new access and refresh tokens to Redis
-    await add_token_to_redis(
-        redis_client,
-        current_user,
-        access_token,
-        TokenType.ACCESS,
-        settings.ACCESS_TOKEN_EXPIRE_MINUTES,
-    )
-    await add_token_to_redis(
+    # Replace any existing access and refresh tokens for the user
+    await store_tokens(
         redis_client,
-        current_user,
-        refresh_token,
-        TokenType.REFRESH,
-        settings.REFRESH_TOKEN_EXPIRE_MINUTES,
+        current_user.id,
+        {TokenType.ACCESS: access_token, TokenType.REFRESH: refresh_token},
+        replace=True,
     )
 
-    logger.info(f"User '{current_user.email}' changed password")
+    logger.info("User '{}' changed password", current_user.id)
 
     return create_response(data=data, message="New password generated")
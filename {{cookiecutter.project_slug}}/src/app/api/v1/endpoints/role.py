@@ -3,6 +3,8 @@ from fastapi_pagination import Params
 
 from app import crud
 from app.api import deps
+from app.api.responses import FastJSONRoute
+from app.core.query_audit import query_budget
 from app.deps import role_deps
 from app.models.role_model import Role
 from app.models.user_model import User
@@ -18,8 +20,10 @@ from app.utils.exceptions import (
     ContentNoChangeException,
     NameExistException,
 )
+from app.utils.response_cache import cached
+from app.utils.role_catalog import role_catalog
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.post("", status_code=status.HTTP_201_CREATED)
@@ -32,7 +36,7 @@ async def create_role(
     Required roles:
       - admin
     """
-    role_current = await crud.role.get_role_by_name(name=role.name)
+    role_current = role_catalog.get_by_name(role.name)
     if role_current:
         raise NameExistException(Role, name=role_current.name)
 
@@ -41,6 +45,8 @@ async def create_role(
 
 
 @router.get("/list")
+@query_budget(3)
+@cached("Role")
 async def get_roles_list(
     params: Params = Depends(),
     current_user: User = Depends(deps.get_current_user()),
@@ -52,6 +58,7 @@ async def get_roles_list(
 
 
 @router.get("/{role_id}", status_code=status.HTTP_200_OK)
+@query_budget(1)
 async def get_role_by_id(
     role: Role = Depends(role_deps.get_role_by_id),  # role_id
     current_user: User = Depends(deps.get_current_user()),
@@ -61,6 +68,7 @@ async def get_role_by_id(
 
 
 @router.put("/{role_id}")
+@query_budget(3)
 async def update_permission(
     role: IRoleUpdate,
     current_role: Role = Depends(role_deps.get_role_by_id),  # role_id
@@ -74,10 +82,10 @@ async def update_permission(
     if current_role.name == role.name and current_role.description == role.description:
         raise ContentNoChangeException()
 
-    exist_role = await crud.role.get_role_by_name(name=role.name)
-    if exist_role:
+    exist_role = role_catalog.get_by_name(role.name)
+    if exist_role and exist_role.id != current_role.id:
         raise NameExistException(Role, name=role.name)
 
-    updated_role = await crud.role.update(obj_current=current_role, obj_new=role)
+    updated_role = await crud.role.update_by_id(id=current_role.id, obj_new=role)
 
     return create_response(data=updated_role)
@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends, Query, status
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Path, Query, status
 from fastapi_pagination import Params
 from loguru import logger
 
 from app import crud
 from app.api import deps
-from app.deps import user_deps
+from app.api.responses import FastJSONRoute
+from app.core.query_audit import query_budget
 from app.models import User
 from app.models.role_model import Role
-from app.schemas.common_schema import IOrderEnum
+from app.schemas.common_schema import ICountStrategyEnum, ICursorParams, IOrderEnum
 from app.schemas.response_schema import (
+    CursorPageBase,
     IDeleteResponseBase,
     IGetResponseBase,
     IGetResponsePaginated,
@@ -19,11 +23,14 @@ from app.schemas.response_schema import (
 from app.schemas.role_schema import IRoleEnum
 from app.schemas.user_schema import IUserCreate, IUserRead, IUserUpdate
 from app.utils.exceptions import IdNotFoundException, UserSelfDeleteException
+from app.utils.response_cache import cached
+from app.utils.role_catalog import role_catalog
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.get("")
+@query_budget(1)
 async def get_my_data(
     current_user: User = Depends(deps.get_current_user()),
 ) -> IGetResponseBase[IUserRead]:
@@ -33,25 +40,22 @@ async def get_my_data(
 
 
 @router.put("")
+@query_budget(2)
 async def update_my_data(
     user: IUserUpdate,
     current_user: User = Depends(deps.get_current_user()),
 ) -> IPutResponseBase[IUserRead]:
     """Update my user profile information."""
-    if current_user.email != user.email:
-        await user_deps.email_exists(user=user)
-    if current_user.username != user.username:
-        await user_deps.username_exists(user=user)
-
-    user_updated = await crud.user.update(obj_new=user, obj_current=current_user)
-    logger.info(f"User '{current_user.id}' updated profile information")
+    user_updated = await crud.user.update_by_id(id=current_user.id, obj_new=user)
+    logger.info("User '{}' updated profile information", current_user.id)
 
     return create_response(data=user_updated)
 
 
 @router.post("", status_code=status.HTTP_201_CREATED)
+@query_budget(2)
 async def create_user(
-    user: IUserCreate = Depends(user_deps.user_exists),
+    user: IUserCreate,
     current_user: User = Depends(deps.get_current_user(required_roles=[IRoleEnum.admin])),
 ) -> IPostResponseBase[IUserRead]:
     """Creates a new user.
@@ -59,7 +63,7 @@ async def create_user(
     Required roles:
       - admin
     """
-    role = await crud.role.get(id=user.role_id)
+    role = role_catalog.get_by_id(user.role_id)
     if not role:
         raise IdNotFoundException(Role, id=user.role_id)
 
@@ -69,17 +73,26 @@ async def create_user(
 
 
 @router.get("/list")
+@query_budget(3)
 async def read_users_list(
     params: Params = Depends(),
     current_user: User = Depends(deps.get_current_user()),
 ) -> IGetResponsePaginated[IUserRead]:
-    """Retrieve users. Requires admin or manager role."""
-    users = await crud.user.get_multi_paginated(params=params)
+    """Retrieve users. Requires admin or manager role.
+
+    `total` is cached for a few seconds, so it may lag behind recent writes.
+    """
+    users = await crud.user.get_multi_paginated(
+        params=params,
+        count_strategy=ICountStrategyEnum.cached,
+        load_profile="without_role",
+    )
 
     return create_response(data=users)
 
 
 @router.get("/list/by_created_at")
+@query_budget(3)
 async def get_user_list_order_by_created_at(
     order: IOrderEnum
     | None = Query(
@@ -94,25 +107,73 @@ async def get_user_list_order_by_created_at(
         params=params,
         order=order,
         order_by="created_at",
+        count_strategy=ICountStrategyEnum.cached,
+        load_profile="without_role",
+    )
+
+    return create_response(data=users)
+
+
+@router.get("/list/cursor")
+@query_budget(2)
+async def read_users_list_by_cursor(
+    params: ICursorParams = Depends(),
+    current_user: User = Depends(deps.get_current_user()),
+) -> IGetResponseBase[CursorPageBase[IUserRead]]:
+    """Retrieve users using cursor pagination, ordered by id (creation order).
+
+    Pass `next_cursor` or `previous_cursor` from a response as `cursor` to move
+    between pages; the cost of a page does not depend on how deep it is.
+    """
+    users = await crud.user.get_multi_cursor_paginated(params=params, load_profile="without_role")
+
+    return create_response(data=users)
+
+
+@router.get("/list/by_created_at/cursor")
+@query_budget(2)
+async def get_user_list_order_by_created_at_by_cursor(
+    order: IOrderEnum
+    | None = Query(
+        default=IOrderEnum.ascendent,
+        description="It is optional. Default is ascendent",
+    ),
+    params: ICursorParams = Depends(),
+    current_user: User = Depends(deps.get_current_user()),
+) -> IGetResponseBase[CursorPageBase[IUserRead]]:
+    """Gets a cursor paginated list of users ordered by created datetime."""
+    users = await crud.user.get_multi_cursor_paginated(
+        params=params,
+        order=order,
+        order_by="created_at",
+        load_profile="without_role",
     )
 
     return create_response(data=users)
 
 
 @router.get("/{user_id}")
+@query_budget(2)
+@cached("User")
 async def get_user_by_id(
-    user: User = Depends(user_deps.is_valid_user),  # user_id
+    user_id: UUID = Path(title="The UUID id of the user"),
     current_user: User = Depends(deps.get_current_user()),
 ) -> IGetResponseBase[IUserRead]:
     """
     Gets a user by his/her id."""
+    # Looked up in the cached body, so a cache hit skips the query
+    user = await crud.user.get(id=user_id, load_profile="without_role")
+    if not user:
+        raise IdNotFoundException(User, id=user_id)
+
     return create_response(data=user)
 
 
 @router.put("/{user_id}")
+@query_budget(2)
 async def update_user_by_id(
     user: IUserUpdate,
-    updated_user: User = Depends(user_deps.is_valid_user),  # user_id
+    user_id: UUID = Path(title="The UUID id of the user"),
     current_user: User = Depends(deps.get_current_user(required_roles=[IRoleEnum.admin])),
 ) -> IPutResponseBase[IUserRead]:
     """Update a user by his/her id.
@@ -120,19 +181,15 @@ async def update_user_by_id(
     Required roles:
       - admin
     """
-    if updated_user.email != user.email:
-        await user_deps.email_exists(user=user)
-    if updated_user.username != user.username:
-        await user_deps.username_exists(user=user)
-
-    user_updated = await crud.user.update(obj_new=user, obj_current=updated_user)
+    user_updated = await crud.user.update_by_id(id=user_id, obj_new=user)
 
     return create_response(data=user_updated)
 
 
 @router.delete("/{user_id}")
+@query_budget(2)
 async def remove_user_by_id(
-    user: User = Depends(user_deps.is_valid_user),  # user_id
+    user_id: UUID = Path(title="The UUID id of the user"),
     current_user: User = Depends(deps.get_current_user(required_roles=[IRoleEnum.admin])),
 ) -> IDeleteResponseBase[IUserRead]:
     """Delete a user by his/her id.
@@ -140,9 +197,9 @@ async def remove_user_by_id(
     Required roles:
       - admin
     """
-    if current_user.id == user.id:
+    if current_user.id == user_id:
         raise UserSelfDeleteException()
 
-    user = await crud.user.remove(id=user.id)
+    user = await crud.user.remove(id=user_id)
 
     return create_response(data=user, message="User removed")
@@ -4,10 +4,13 @@ from functools import lru_cache
 from typing import Any
 
 from loguru import logger
-from pydantic import AnyHttpUrl, BaseSettings, PostgresDsn, validator
+from pydantic import AnyHttpUrl, BaseSettings, PostgresDsn, root_validator, validator
 
 from app.core import logging
 
+# Held for the life of each worker by the principal cache and role catalog listeners
+REDIS_PUBSUB_CONNECTIONS = 2
+
 
 class ModeEnum(str, Enum):
     development = "development"
@@ -15,11 +18,19 @@ class ModeEnum(str, Enum):
     testing = "testing"
 
 
+class ExecutorEnum(str, Enum):
+    thread = "thread"
+    process = "process"
+
+
 class Settings(BaseSettings):
     # --------------------------------------------------
     # > Application
     # --------------------------------------------------
     MODE: ModeEnum = ModeEnum.development
+    # Outside production, statement shapes run this many times by one request
+    # are reported as possible N+1 queries, see `app.core.query_audit`
+    QUERY_REPEAT_THRESHOLD: int = 3
     APP_TITLE: str = "{{cookiecutter.project_slug}}"
     APP_VERSION: str = "1.0.0"
     APP_DESCRIPTION: str = "My app"
@@ -34,6 +45,20 @@ class Settings(BaseSettings):
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 180  # 180 days
     SECRET_KEY: str
 
+    # Resolved users cached per access token, 0 disables the cache
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
+    # Prometheus metrics at /metrics, when off nothing is instrumented at all
+    METRICS_ENABLED: bool = False
+
+    # --------------------------------------------------
+    # > Password hashing
+    # --------------------------------------------------
+    PASSWORD_HASH_EXECUTOR: ExecutorEnum = ExecutorEnum.thread
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 8
+
     # --------------------------------------------------
     # > Postgres
     # --------------------------------------------------
@@ -44,13 +69,69 @@ class Settings(BaseSettings):
     DB_PORT: int | str
     DB_NAME: str
 
+    # Connections available to the whole deployment, split between workers
+    WEB_CONCURRENCY: int = 1
+    DB_MAX_CONNECTIONS: int = 100
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_SIZE: int | None
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_ECHO: bool = False
+
+    # Totals reused by paginated lists using the `cached` count strategy
+    PAGINATION_COUNT_CACHE_SIZE: int = 1_000
+    PAGINATION_COUNT_CACHE_TTL_SECONDS: int = 30
+
+    @root_validator(skip_on_failure=True)
+    def assemble_db_pool(cls, values: dict[str, Any]) -> dict[str, Any]:
+        # Pool and overflow of every worker share its part of DB_MAX_CONNECTIONS
+        connections_per_worker = values["DB_MAX_CONNECTIONS"] // max(values["WEB_CONCURRENCY"], 1)
+        if connections_per_worker < 1:
+            raise ValueError("DB_MAX_CONNECTIONS must allow at least one connection per worker")
+        pool_size = values["DB_POOL_SIZE"] or max(
+            connections_per_worker - values["DB_MAX_OVERFLOW"], 1
+        )
+        if pool_size > connections_per_worker:
+            raise ValueError(
+                f"DB_POOL_SIZE={pool_size} exceeds the {connections_per_worker} connections"
+                " of each worker under DB_MAX_CONNECTIONS"
+            )
+        values["DB_POOL_SIZE"] = pool_size
+        values["DB_MAX_OVERFLOW"] = min(
+            values["DB_MAX_OVERFLOW"], connections_per_worker - pool_size
+        )
+        return values
+
     # --------------------------------------------------
     # > Redis
     # --------------------------------------------------
     REDIS_HOST: str
     REDIS_PORT: str
     REDIS_PASSWORD: str
-    REDIS_POOL_SIZE: str
+    # Like DB_MAX_CONNECTIONS, a budget for the whole deployment split between
+    # workers; requests wait up to REDIS_POOL_TIMEOUT for a free connection.
+    # REDIS_POOL_SIZE excludes the REDIS_PUBSUB_CONNECTIONS of each worker
+    REDIS_MAX_CONNECTIONS: int = 100
+    REDIS_POOL_SIZE: int | None
+    REDIS_POOL_TIMEOUT: int = 20
+    # Default lifetime of responses cached with `app.utils.response_cache.cached`
+    RESPONSE_CACHE_EXPIRE_SECONDS: int = 60
+
+    @validator("REDIS_POOL_SIZE", pre=True, always=True)
+    def assemble_redis_pool_size(cls, v: int | None, values: dict[str, Any]) -> int:
+        if v:
+            return int(v)
+        connections_per_worker = values["REDIS_MAX_CONNECTIONS"] // max(
+            values["WEB_CONCURRENCY"], 1
+        )
+        if connections_per_worker <= REDIS_PUBSUB_CONNECTIONS:
+            raise ValueError(
+                f"REDIS_MAX_CONNECTIONS must allow at least {REDIS_PUBSUB_CONNECTIONS + 1}"
+                f" connections per worker, {REDIS_PUBSUB_CONNECTIONS} of them held by the"
+                " pub/sub listeners"
+            )
+        return connections_per_worker - REDIS_PUBSUB_CONNECTIONS
 
     ASYNC_DB_URI: str | None
 
@@ -89,6 +170,14 @@ class LogSettings(BaseSettings):
     LOG_FILE_NAME: str = "log_file_name.log"
     LOG_ROTATION: time
     LOG_RETENTION: timedelta
+    LOG_LEVEL: str = "INFO"
+    LOG_FILE_LEVEL: str = "DEBUG"
+    # Write records from a background thread instead of the caller's
+    LOG_ENQUEUE: bool = True
+    # One JSON object per record instead of text lines
+    LOG_JSON: bool = False
+    # Sample uvicorn access logs above this many lines per second, 0 keeps all
+    LOG_ACCESS_MAX_QPS: float = 0
 
     @validator("LOG_ROTATION", pre=True)
     def assemble_log_rotation(cls, v: str | None) -> time:
@@ -122,6 +211,11 @@ def load_log_config():
         log_settings.LOG_FILE_NAME,
         log_settings.LOG_ROTATION,
         log_settings.LOG_RETENTION,
+        level=log_settings.LOG_LEVEL,
+        file_level=log_settings.LOG_FILE_LEVEL,
+        enqueue=log_settings.LOG_ENQUEUE,
+        serialize=log_settings.LOG_JSON,
+        access_log_max_qps=log_settings.LOG_ACCESS_MAX_QPS,
     )
 
 
@@ -1,6 +1,13 @@
 import logging
+import os
+import queue
 import sys
+import threading
+import time as _time
+import traceback
+from collections.abc import Callable
 from datetime import time, timedelta
+from logging.handlers import TimedRotatingFileHandler
 
 from loguru import logger
 
@@ -13,22 +20,135 @@ class InterceptHandler(logging.Handler):
         except ValueError:
             level = record.levelno
 
-        # Find caller from where originated the logged message
-        frame = logging.currentframe()
-        depth = 2
-        while frame.f_code.co_filename == logging.__file__:
-            if frame.f_back:
-                frame = frame.f_back
-            depth += 1
+        # The record already knows where it was logged from, no need to walk the stack
+        logger.opt(exception=record.exc_info).patch(
+            lambda r: r.update(name=record.name, function=record.funcName, line=record.lineno)
+        ).log(level, record.getMessage())
 
-        logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
+
+class AccessLogSampler(logging.Filter):
+    """Limit uvicorn access log lines to `max_qps` per second with a token bucket.
+
+    The bucket holds up to `max_qps` lines and refills at `max_qps` per second,
+    so traffic under the limit is logged whole and heavier traffic keeps one
+    line every 1/`max_qps` seconds, spread evenly over time rather than
+    favouring the start of each second. Only a burst after a quiet period can
+    add up to `max_qps` lines on top. Server errors are always kept and use no
+    tokens. `dropped` counts the lines that were sampled out.
+    """
+
+    def __init__(self, max_qps: float) -> None:
+        super().__init__()
+        self.max_qps = max_qps
+        self.dropped = 0
+        self._capacity = max(max_qps, 1)
+        self._tokens = self._capacity
+        self._updated = _time.monotonic()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self._is_server_error(record):
+            return True
+
+        now = _time.monotonic()
+        elapsed, self._updated = now - self._updated, now
+        self._tokens = min(self._tokens + elapsed * self.max_qps, self._capacity)
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        self.dropped += 1
+        return False
+
+    @staticmethod
+    def _is_server_error(record: logging.LogRecord) -> bool:
+        # uvicorn access records: (client_addr, method, full_path, http_version, status_code)
+        args = record.args
+        return isinstance(args, tuple) and len(args) == 5 and int(args[4]) >= 500
+
+
+class BackgroundWriter:
+    """Loguru sink that hands formatted records to a writer thread.
+
+    `write` only puts the message on an in-memory queue, so callers never wait
+    on the terminal or the disk. Unlike loguru's `enqueue=True`, which pickles
+    every record through a multiprocessing queue, nothing is copied. Stopping
+    the sink (`logger.remove`, also run at exit) writes what is still queued.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[str], None],
+        flush: Callable[[], None] | None = None,
+        close: Callable[[], None] | None = None,
+    ) -> None:
+        self._write = write
+        self._flush = flush
+        self._close = close
+        self._queue: queue.SimpleQueue[str | None] = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message: str) -> None:
+        self._queue.put(message)
+
+    def stop(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        if self._close is not None:
+            self._close()
+
+    def _run(self) -> None:
+        stopped = False
+        while not stopped:
+            # Write everything queued so far at once, the thread holds the GIL
+            # while it writes so it should wake up as rarely as possible
+            batch = [self._queue.get()]
+            while not self._queue.empty():
+                batch.append(self._queue.get())
+            if None in batch:
+                stopped = True
+                batch = batch[: batch.index(None)]
+            if not batch:
+                continue
+            try:
+                self._write("".join(batch))
+                if self._flush is not None:
+                    self._flush()
+            except Exception:
+                traceback.print_exc()
+
+
+def _rotating_file_writer(path: str, rotation: time, retention: timedelta) -> BackgroundWriter:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    handler = TimedRotatingFileHandler(
+        path, when="midnight", atTime=rotation, backupCount=retention.days, encoding="utf8"
+    )
+    # Messages formatted by loguru already end with a newline
+    handler.terminator = ""
+    return BackgroundWriter(
+        lambda message: handler.emit(logging.makeLogRecord({"msg": message})),
+        close=handler.close,
+    )
 
 
 def setup(
     file_name: str = "log.log",
     rotation: time = time(),
     retention: timedelta = timedelta(days=3),
+    level: str = "INFO",
+    file_level: str = "DEBUG",
+    enqueue: bool = True,
+    serialize: bool = False,
+    access_log_max_qps: float = 0,
 ) -> None:
+    """Send loguru and stdlib logging to stderr and a rotating file.
+
+    With `enqueue`, records are formatted by the caller and written by a
+    `BackgroundWriter` thread, so request handlers never block on the file or
+    the terminal; the file then rotates through `TimedRotatingFileHandler`.
+    `serialize` writes one JSON object per record instead of text lines, and
+    `access_log_max_qps` (0 disables it) samples uvicorn access logs above that
+    rate.
+    """
     # Disable some packages logging
     # logging.getLogger(gino.__name__).setLevel(logging.FATAL)
     logging.getLogger("urllib3.connectionpool").setLevel(logging.FATAL)
@@ -38,12 +158,40 @@ def setup(
     # Change handler for default uvicorn logger
     intercept_handler = InterceptHandler()
     logging.getLogger("uvicorn").handlers = [intercept_handler]
-    logging.getLogger("uvicorn.access").handlers = [intercept_handler]
+    access_logger = logging.getLogger("uvicorn.access")
+    access_logger.handlers = [intercept_handler]
+    # Each record is handled once, not again by the root logger
+    logging.getLogger("uvicorn").propagate = False
+    access_logger.propagate = False
+    access_logger.filters = []
+    if access_log_max_qps > 0:
+        access_logger.addFilter(AccessLogSampler(access_log_max_qps))
 
     # Setup loguru
     logger.remove()
-    logger.add(sys.stderr, level="INFO")
-    logger.add(f"logs/{file_name}", rotation=rotation, retention=retention, level="DEBUG")
+    if enqueue:
+        logger.add(
+            BackgroundWriter(sys.stderr.write, flush=sys.stderr.flush),
+            level=level,
+            serialize=serialize,
+            colorize=sys.stderr.isatty() and not serialize,
+        )
+        logger.add(
+            _rotating_file_writer(f"logs/{file_name}", rotation, retention),
+            level=file_level,
+            serialize=serialize,
+        )
+    else:
+        logger.add(sys.stderr, level=level, serialize=serialize)
+        logger.add(
+            f"logs/{file_name}",
+            rotation=rotation,
+            retention=retention,
+            level=file_level,
+            serialize=serialize,
+        )
 
-    # Send default logging to loguru
-    logging.basicConfig(handlers=[intercept_handler], level=0)
+    # Send default logging to loguru, records below every sink's level are
+    # discarded by the stdlib before a `LogRecord` is even created
+    min_level = min(logger.level(level).no, logger.level(file_level).no)
+    logging.basicConfig(handlers=[intercept_handler], level=min_level, force=True)
@@ -0,0 +1,288 @@
+import os
+from collections.abc import Iterator
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any
+
+from fastapi import APIRouter, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from sqlalchemy import event
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.security import password_hasher
+from app.utils.response_cache import response_cache
+
+registry = CollectorRegistry()
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "Requests by method, route and status code",
+    ["method", "route", "status"],
+    registry=registry,
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by method and route",
+    ["method", "route"],
+    registry=registry,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests being handled",
+    registry=registry,
+    multiprocess_mode="livesum",
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries run by a request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+    registry=registry,
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Time a request spent in database queries",
+    ["method", "route"],
+    registry=registry,
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Latency of each database query by operation",
+    ["operation"],
+    registry=registry,
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total",
+    "Database queries that failed, e.g. on a constraint violation, by operation",
+    ["operation"],
+    registry=registry,
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30),
+    registry=registry,
+)
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds",
+    "Latency of Redis commands, pipelines count as one `pipeline` command",
+    ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+    registry=registry,
+)
+
+# Routes that did not match an `APIRoute`, e.g. 404s and the docs
+OTHER_ROUTE = "other"
+_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+
+class _QueryStats:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+
+
+_request_queries: ContextVar[_QueryStats | None] = ContextVar("request_queries", default=None)
+
+
+class MetricsMiddleware:
+    """Record latency, status code and database usage of every HTTP request.
+
+    Requests are labelled with the route template (`/user/{user_id}`), which
+    FastAPI stores in the scope once it has matched the path, never with the
+    raw path.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        queries = _QueryStats()
+        token = _request_queries.set(queries)
+        REQUESTS_IN_FLIGHT.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            _request_queries.reset(token)
+
+            route = scope.get("route")
+            labels = (scope["method"], route.path if route is not None else OTHER_ROUTE)
+            REQUESTS.labels(*labels, str(status_code)).inc()
+            REQUEST_DURATION.labels(*labels).observe(duration)
+            REQUEST_DB_QUERIES.labels(*labels).observe(queries.count)
+            REQUEST_DB_DURATION.labels(*labels).observe(queries.seconds)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start_time", []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    duration = perf_counter() - conn.info["query_start_time"].pop()
+    DB_QUERY_DURATION.labels(_operation(statement)).observe(duration)
+
+    queries = _request_queries.get()
+    if queries is not None:
+        queries.count += 1
+        queries.seconds += duration
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    # after_cursor_execute does not run for failed queries, drop their start time here
+    # so it does not stay on the connection, which outlives the checkout
+    start_times = context.connection.info.get("query_start_time") if context.connection else None
+    if context.statement is None or not start_times:
+        return
+
+    start_times.pop()
+    DB_QUERY_ERRORS.labels(_operation(context.statement)).inc()
+
+
+def _operation(statement: str) -> str:
+    operation = statement.lstrip()[:6].upper()
+    return operation if operation in _OPERATIONS else "OTHER"
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Default async pool that also records how long checkouts wait."""
+
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(perf_counter() - start)
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True) -> list[Any]:
+        start = perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            REDIS_COMMAND_DURATION.labels("pipeline").observe(perf_counter() - start)
+
+
+class InstrumentedRedis(Redis):
+    """`Redis` client recording the latency of every command and pipeline."""
+
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        start = perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_DURATION.labels(str(args[0]).upper()).observe(perf_counter() - start)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> Pipeline:
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class AppStatsCollector(Collector):
+    """Gauges read from the app's own counters when `/metrics` is scraped."""
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+
+    def collect(self) -> Iterator[Metric]:
+        pool = self.engine.sync_engine.pool
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            connections = GaugeMetricFamily(
+                "db_pool_connections", "Connections of the pool by state", labels=["state"]
+            )
+            connections.add_metric(["checked_out"], pool.checkedout())
+            connections.add_metric(["idle"], pool.checkedin())
+            connections.add_metric(["overflow"], max(pool.overflow(), 0))
+            yield connections
+            yield GaugeMetricFamily("db_pool_size", "Connections kept by the pool", pool.size())
+
+        stats = password_hasher.stats
+        hasher = GaugeMetricFamily(
+            "password_hasher_operations", "bcrypt operations by state", labels=["state"]
+        )
+        hasher.add_metric(["queued"], stats["queued"])
+        hasher.add_metric(["in_flight"], stats["in_flight"])
+        yield hasher
+        yield CounterMetricFamily(
+            "password_hasher_completed", "bcrypt operations completed", stats["completed"]
+        )
+
+        cache = CounterMetricFamily(
+            "response_cache_lookups",
+            "Cached response lookups by model and result",
+            labels=["model", "result"],
+        )
+        for namespace, counts in response_cache.stats.items():
+            cache.add_metric([namespace, "hit"], counts["hits"])
+            cache.add_metric([namespace, "miss"], counts["misses"])
+        yield cache
+
+
+_app_stats: AppStatsCollector | None = None
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time every query of `engine` and export the state of its pool."""
+    global _app_stats
+
+    if _app_stats is not None:
+        return
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
+    _app_stats = AppStatsCollector(engine)
+    registry.register(_app_stats)
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus text exposition of every metric above.
+
+    With several worker processes, set `PROMETHEUS_MULTIPROC_DIR` to a shared
+    empty directory so the counters of all workers are aggregated; the
+    scrape-time `AppStatsCollector` gauges then describe the worker answering.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        scrape_registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(scrape_registry)
+        if _app_stats is not None:
+            scrape_registry.register(_app_stats)
+    else:
+        scrape_registry = registry
+    return Response(generate_latest(scrape_registry), media_type=CONTENT_TYPE_LATEST)
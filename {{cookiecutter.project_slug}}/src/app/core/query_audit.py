@@ -0,0 +1,181 @@
+import re
+import sys
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from types import FrameType
+from typing import Any, NamedTuple, TypeVar
+
+import greenlet
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import ModeEnum, settings
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Frames from these files are reported, relative to `_ROOT`
+_APP_DIR = str(Path(__file__).resolve().parents[1])
+_ROOT = str(Path(_APP_DIR).parent)
+_STACKS_PER_FINGERPRINT = 3
+
+_WHITESPACE = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\$\d+|%(?:\(\w+\))?s|\b\d+\b")
+_VALUE_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def fingerprint(statement: str) -> str:
+    """Statement shape: literals and bound parameters become `?`, IN lists `(?+)`."""
+    statement = _LITERALS.sub("?", _WHITESPACE.sub(" ", statement).strip())
+    return _VALUE_LISTS.sub("(?+)", statement)
+
+
+class QueryRecord(NamedTuple):
+    fingerprint: str
+    statement: str
+    stack: tuple[str, ...]
+
+
+class QueryLog:
+    """Statements run while the log is active, with the app frames that issued them."""
+
+    def __init__(self) -> None:
+        self.queries: list[QueryRecord] = []
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+    def by_fingerprint(self) -> dict[str, list[QueryRecord]]:
+        groups: defaultdict[str, list[QueryRecord]] = defaultdict(list)
+        for query in self.queries:
+            groups[query.fingerprint].append(query)
+        return groups
+
+    def repeated(self, threshold: int) -> dict[str, list[QueryRecord]]:
+        """Statement shapes run at least `threshold` times, usually an N+1."""
+        return {
+            statement: queries
+            for statement, queries in self.by_fingerprint().items()
+            if len(queries) >= threshold
+        }
+
+    def report(self, title: str) -> str:
+        lines = [title]
+        for statement, queries in self.by_fingerprint().items():
+            lines.append(f"  {len(queries)}x {statement}")
+            stacks = list(dict.fromkeys(query.stack for query in queries))
+            for stack in stacks[:_STACKS_PER_FINGERPRINT]:
+                lines.extend(f"      {frame}" for frame in stack or ("<no app frames>",))
+                lines.append("")
+        return "\n".join(lines)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request or `track_queries` block ran more statements than its budget."""
+
+
+_current_log: ContextVar[QueryLog | None] = ContextVar("query_log", default=None)
+
+
+def _app_frames(frame: FrameType | None) -> Iterator[str]:
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APP_DIR) and filename != __file__:
+            path = filename[len(_ROOT) + 1 :]
+            yield f"{path}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+
+
+def _app_stack() -> tuple[str, ...]:
+    frames = list(_app_frames(sys._getframe(1)))
+    # With the asyncio extension SQLAlchemy runs in a child greenlet, the
+    # coroutines that awaited it are suspended in the parent one
+    parent = greenlet.getcurrent().parent
+    if parent is not None:
+        frames.extend(_app_frames(parent.gr_frame))
+    return tuple(reversed(frames))
+
+
+def _record_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    log = _current_log.get()
+    if log is not None:
+        log.queries.append(QueryRecord(fingerprint(statement), statement, _app_stack()))
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Record the statements of `engine` into the active `QueryLog`, if any."""
+    if not event.contains(engine.sync_engine, "before_cursor_execute", _record_query):
+        event.listen(engine.sync_engine, "before_cursor_execute", _record_query)
+
+
+def _check(log: QueryLog, title: str, budget: int | None) -> None:
+    if budget is not None and len(log) > budget:
+        message = log.report(f"{title} ran {len(log)} queries, over its budget of {budget}")
+        if settings.MODE == ModeEnum.testing:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+    elif log.repeated(settings.QUERY_REPEAT_THRESHOLD):
+        logger.warning(log.report(f"{title} repeated statements, possible N+1"))
+
+
+@contextmanager
+def track_queries(budget: int | None = None, title: str = "Block") -> Iterator[QueryLog]:
+    """Record the statements run inside the block and check them on exit.
+
+    Meant for tests: `with track_queries(budget=2): await crud.user.get(...)`
+    raises `QueryBudgetExceeded` in testing mode when more than two statements
+    ran. Requires the engine to be instrumented, which it is outside production.
+    """
+    log = QueryLog()
+    token = _current_log.set(log)
+    try:
+        yield log
+    finally:
+        _current_log.reset(token)
+    _check(log, title, budget)
+
+
+def query_budget(max_queries: int) -> Callable[[F], F]:
+    """Declare how many SQL statements a route may run, checked by `QueryAuditMiddleware`."""
+
+    def decorator(func: F) -> F:
+        func.__query_budget__ = max_queries
+        return func
+
+    return decorator
+
+
+class QueryAuditMiddleware:
+    """Check the statements of each request against the route's `query_budget`.
+
+    Only installed outside production. Over-budget requests are logged with the
+    statement fingerprints and the app frames that issued them; in testing mode
+    they raise `QueryBudgetExceeded` instead, which fails the test client call.
+    Statement shapes repeated `QUERY_REPEAT_THRESHOLD` times are logged as
+    possible N+1 queries.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        log = QueryLog()
+        token = _current_log.set(log)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_log.reset(token)
+
+        route = scope.get("route")
+        if route is None:
+            return
+        budget = getattr(route.endpoint, "__query_budget__", None)
+        _check(log, f"{scope['method']} {route.path}", budget)
@@ -1,10 +1,15 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, TypeVar
 
 import bcrypt
 import jwt
 
-from app.core.config import settings
+from app.core.config import ExecutorEnum, settings
+
+R = TypeVar("R")
 
 
 def create_access_token(subject: str | Any, expires_delta: timedelta = None) -> str:
@@ -71,3 +76,89 @@ def get_password_hash(plain_password: str | bytes) -> str:
         plain_password = plain_password.encode()
 
     return bcrypt.hashpw(plain_password, bcrypt.gensalt()).decode()
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated executor so it never blocks the event loop.
+
+    At most `max_concurrency` operations are submitted at once; the rest wait
+    on a semaphore, which keeps a login burst from starving the executor and
+    makes the backlog observable through `stats`.
+    """
+
+    def __init__(
+        self,
+        executor_type: ExecutorEnum = ExecutorEnum.thread,
+        max_workers: int = 4,
+        max_concurrency: int = 8,
+    ) -> None:
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self._executor: Executor | None = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._queued = 0
+        self._in_flight = 0
+        self._completed = 0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == ExecutorEnum.process:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="password-hasher"
+                )
+        return self._executor
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": self._queued,
+            "in_flight": self._in_flight,
+            "completed": self._completed,
+            "max_concurrency": self.max_concurrency,
+        }
+
+    async def _run(self, func: Callable[..., R], *args: Any) -> R:
+        self._queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._queued -= 1
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self._in_flight -= 1
+            self._completed += 1
+            self._semaphore.release()
+
+    async def verify(self, plain_password: str | bytes, hashed_password: str | bytes) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, plain_password: str | bytes) -> str:
+        return await self._run(get_password_hash, plain_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor_type=settings.PASSWORD_HASH_EXECUTOR,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_concurrency=settings.PASSWORD_HASH_MAX_CONCURRENCY,
+)
+
+
+async def verify_password_async(plain_password: str | bytes, hashed_password: str | bytes) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
+
+
+async def get_password_hash_async(plain_password: str | bytes) -> str:
+    return await password_hasher.hash(plain_password)
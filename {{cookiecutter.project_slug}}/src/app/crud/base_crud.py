@@ -1,18 +1,30 @@
-from typing import Any, Generic, TypeVar
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, ClassVar, Generic, TypeVar
 from uuid import UUID
 
 from fastapi import HTTPException
 from fastapi_async_sqlalchemy import db
 from fastapi_async_sqlalchemy.middleware import DBSessionMeta
 from fastapi_pagination import Page, Params
-from fastapi_pagination.ext.async_sqlalchemy import paginate
+from fastapi_pagination.api import create_page
 from pydantic import BaseModel
-from sqlalchemy import exc
+from sqlalchemy import any_, bindparam, cast, delete, exc, inspect, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, Insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.sql.base import ExecutableOption
+from sqlalchemy.sql.elements import ColumnElement
 from sqlmodel import SQLModel, func, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel.sql.expression import Select
 
-from app.schemas.common_schema import IOrderEnum
+from app.db.explain import estimate_row_count
+from app.schemas.common_schema import ICountStrategyEnum, ICursorParams, IOrderEnum
+from app.schemas.response_schema import CursorPageBase
+from app.utils.count_cache import count_cache
+from app.utils.cursor import Cursor, CursorDirection, decode_cursor, encode_cursor
+from app.utils.exceptions import IdNotFoundException
+from app.utils.response_cache import response_cache
 
 ModelType = TypeVar("ModelType", bound=SQLModel)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -20,8 +32,19 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 SchemaType = TypeVar("SchemaType", bound=BaseModel)
 T = TypeVar("T", bound=SQLModel)
 
+# Rows per INSERT/UPDATE/DELETE statement in the *_many methods
+BULK_CHUNK_SIZE = 5_000
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    # Named sets of loader options, e.g. {"with_role": [joinedload(User.role)]}.
+    # Read methods accept `load_profile` and/or explicit `options`.
+    load_profiles: ClassVar[dict[str, list[ExecutableOption]]] = {}
+    # Nullable datetime column marking removed rows, e.g. "deleted_at". When
+    # set, `remove` and `remove_many` fill it in instead of deleting the rows,
+    # and the read methods skip the rows where it is set.
+    soft_delete_field: ClassVar[str | None] = None
+
     def __init__(self, model: type[ModelType]):
         """
         CRUD object with default methods to Create, Read, Update, Delete (CRUD).
@@ -35,11 +58,31 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def get_db(self) -> DBSessionMeta:
         return self.db
 
+    def with_load_options(
+        self,
+        query: Select[T],
+        *,
+        options: Sequence[ExecutableOption] | None = None,
+        load_profile: str | None = None,
+    ) -> Select[T]:
+        loader_options = list(options or [])
+        if load_profile is not None:
+            loader_options = [*self.load_profiles[load_profile], *loader_options]
+        if not loader_options:
+            return query
+        return query.options(*loader_options)
+
     async def get(
-        self, *, id: UUID | str, db_session: AsyncSession | None = None
+        self,
+        *,
+        id: UUID | str,
+        options: Sequence[ExecutableOption] | None = None,
+        load_profile: str | None = None,
+        db_session: AsyncSession | None = None,
     ) -> ModelType | None:
         db_session = db_session or self.db.session
-        query = select(self.model).where(self.model.id == id)
+        query = self._select().where(self.model.id == id)
+        query = self.with_load_options(query, options=options, load_profile=load_profile)
         response = await db_session.execute(query)
         return response.scalar_one_or_none()
 
@@ -47,30 +90,100 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         self,
         *,
         list_ids: list[UUID | str],
+        options: Sequence[ExecutableOption] | None = None,
+        load_profile: str | None = None,
         db_session: AsyncSession | None = None,
     ) -> list[ModelType] | None:
         db_session = db_session or self.db.session
-        response = await db_session.execute(select(self.model).where(self.model.id.in_(list_ids)))
+        query = self._select().where(self.model.id.in_(list_ids))
+        query = self.with_load_options(query, options=options, load_profile=load_profile)
+        response = await db_session.execute(query)
         return response.scalars().all()
 
-    async def get_count(self, db_session: AsyncSession | None = None) -> ModelType | None:
+    async def get_count(self, db_session: AsyncSession | None = None) -> int:
         db_session = db_session or self.db.session
         response = await db_session.execute(
-            select(func.count()).select_from(select(self.model).subquery())
+            select(func.count()).select_from(self.model).where(*self._not_removed())
         )
         return response.scalar_one()
 
+    async def count(
+        self,
+        *,
+        query: T | Select[T] | None = None,
+        count_strategy: ICountStrategyEnum = ICountStrategyEnum.exact,
+        db_session: AsyncSession | None = None,
+    ) -> int | None:
+        """Count the rows of `query` using `count_strategy`.
+
+        * `exact`: `SELECT count(*)`, a full scan of the matching rows
+        * `estimated`: the planner's row estimate, no scan
+        * `cached`: an exact count reused for `PAGINATION_COUNT_CACHE_TTL_SECONDS`
+        * `none`: no count at all, returns `None`
+        """
+        db_session = db_session or self.db.session
+        if query is None:
+            query = self._select()
+
+        if count_strategy == ICountStrategyEnum.none:
+            return None
+        if count_strategy == ICountStrategyEnum.estimated:
+            return await estimate_row_count(db_session, query.order_by(None))
+
+        count_query = select(func.count()).select_from(query.order_by(None).subquery())
+        if count_strategy == ICountStrategyEnum.exact:
+            return await db_session.scalar(count_query)
+
+        compiled = count_query.compile()
+        key = f"{compiled}|{sorted(compiled.params.items())}"
+        total = count_cache.get(key)
+        if total is None:
+            total = await db_session.scalar(count_query)
+            count_cache.set(key, total)
+        return total
+
+    async def paginate(
+        self,
+        query: T | Select[T],
+        params: Params,
+        *,
+        count_strategy: ICountStrategyEnum = ICountStrategyEnum.exact,
+        db_session: AsyncSession | None = None,
+    ) -> Page[ModelType]:
+        """Fetch one page of `query` and its total using `count_strategy`.
+
+        One extra row is fetched to tell whether a next page exists, so pages
+        can be navigated even when the total is estimated or omitted.
+        """
+        db_session = db_session or self.db.session
+        total = await self.count(query=query, count_strategy=count_strategy, db_session=db_session)
+
+        offset = params.size * (params.page - 1)
+        response = await db_session.execute(query.offset(offset).limit(params.size + 1))
+        items = response.unique().scalars().all()
+
+        return create_page(
+            items[: params.size],
+            total=total,
+            params=params,
+            count_strategy=count_strategy,
+            has_next=len(items) > params.size,
+        )
+
     async def get_multi(
         self,
         *,
         skip: int = 0,
         limit: int = 100,
         query: T | Select[T] | None = None,
+        options: Sequence[ExecutableOption] | None = None,
+        load_profile: str | None = None,
         db_session: AsyncSession | None = None,
     ) -> list[ModelType]:
         db_session = db_session or self.db.session
         if query is None:
-            query = select(self.model).offset(skip).limit(limit).order_by(self.model.id)
+            query = self._select().offset(skip).limit(limit).order_by(self.model.id)
+        query = self.with_load_options(query, options=options, load_profile=load_profile)
         response = await db_session.execute(query)
         return response.scalars().all()
 
@@ -81,6 +194,8 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         order: IOrderEnum | None = IOrderEnum.ascendent,
         skip: int = 0,
         limit: int = 100,
+        options: Sequence[ExecutableOption] | None = None,
+        load_profile: str | None = None,
         db_session: AsyncSession | None = None,
     ) -> list[ModelType]:
         db_session = db_session or self.db.session
@@ -90,9 +205,10 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             order_by = self.model.id
 
         if order == IOrderEnum.ascendent:
-            query = select(self.model).offset(skip).limit(limit).order_by(columns[order_by].asc())
+            query = self._select().offset(skip).limit(limit).order_by(columns[order_by].asc())
         else:
-            query = select(self.model).offset(skip).limit(limit).order_by(columns[order_by].desc())
+            query = self._select().offset(skip).limit(limit).order_by(columns[order_by].desc())
+        query = self.with_load_options(query, options=options, load_profile=load_profile)
 
         response = await db_session.execute(query)
         return response.scalars().all()
@@ -102,12 +218,18 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         *,
         params: Params | None = Params(),
         query: T | Select[T] | None = None,
+        count_strategy: ICountStrategyEnum = ICountStrategyEnum.exact,
+        options: Sequence[ExecutableOption] | None = None,
+        load_profile: str | None = None,
         db_session: AsyncSession | None = None,
     ) -> Page[ModelType]:
         db_session = db_session or self.db.session
         if query is None:
-            query = select(self.model)
-        return await paginate(db_session, query, params)
+            query = self._select()
+        query = self.with_load_options(query, options=options, load_profile=load_profile)
+        return await self.paginate(
+            query, params, count_strategy=count_strategy, db_session=db_session
+        )
 
     async def get_multi_paginated_ordered(
         self,
@@ -116,6 +238,9 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         order_by: str | None = None,
         order: IOrderEnum | None = IOrderEnum.ascendent,
         query: T | Select[T] | None = None,
+        count_strategy: ICountStrategyEnum = ICountStrategyEnum.exact,
+        options: Sequence[ExecutableOption] | None = None,
+        load_profile: str | None = None,
         db_session: AsyncSession | None = None,
     ) -> Page[ModelType]:
         db_session = db_session or self.db.session
@@ -127,11 +252,79 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
         if query is None:
             if order == IOrderEnum.ascendent:
-                query = select(self.model).order_by(columns[order_by].asc())
+                query = self._select().order_by(columns[order_by].asc())
             else:
-                query = select(self.model).order_by(columns[order_by].desc())
+                query = self._select().order_by(columns[order_by].desc())
+        query = self.with_load_options(query, options=options, load_profile=load_profile)
 
-        return await paginate(db_session, query, params)
+        return await self.paginate(
+            query, params, count_strategy=count_strategy, db_session=db_session
+        )
+
+    async def get_multi_cursor_paginated(
+        self,
+        *,
+        params: ICursorParams | None = ICursorParams(),
+        order_by: str | None = None,
+        order: IOrderEnum | None = IOrderEnum.ascendent,
+        query: T | Select[T] | None = None,
+        options: Sequence[ExecutableOption] | None = None,
+        load_profile: str | None = None,
+        db_session: AsyncSession | None = None,
+    ) -> CursorPageBase[ModelType]:
+        """Keyset pagination over `(order_by, id)`.
+
+        Unlike OFFSET, the cost of a page does not grow with its depth. The
+        order column must be non-nullable; ids are uuid7 so `id` alone is a
+        valid creation order.
+        """
+        db_session = db_session or self.db.session
+
+        columns = self.model.__table__.columns
+        if order_by is None or order_by not in columns:
+            order_by = "id"
+        id_column = columns["id"]
+        sort_columns = [id_column] if order_by == "id" else [columns[order_by], id_column]
+
+        cursor = decode_cursor(params.cursor) if params.cursor else None
+        backwards = cursor is not None and cursor.direction == CursorDirection.previous
+        ascending = (order != IOrderEnum.descendent) != backwards
+
+        if query is None:
+            query = self._select()
+        if cursor is not None:
+            key = tuple_(*sort_columns)
+            position = tuple_(*([cursor.id] if order_by == "id" else [cursor.value, cursor.id]))
+            query = query.where(key > position if ascending else key < position)
+        query = query.order_by(
+            *(column.asc() if ascending else column.desc() for column in sort_columns)
+        ).limit(params.size + 1)
+        query = self.with_load_options(query, options=options, load_profile=load_profile)
+
+        response = await db_session.execute(query)
+        items = response.scalars().all()
+        has_more = len(items) > params.size
+        items = items[: params.size]
+        if backwards:
+            items.reverse()
+
+        def cursor_for(item: ModelType, direction: CursorDirection) -> str:
+            return encode_cursor(
+                Cursor(value=getattr(item, order_by), id=item.id, direction=direction)
+            )
+
+        next_cursor = previous_cursor = None
+        if items and (has_more or backwards):
+            next_cursor = cursor_for(items[-1], CursorDirection.next)
+        if items and (has_more if backwards else cursor is not None):
+            previous_cursor = cursor_for(items[0], CursorDirection.previous)
+
+        return CursorPageBase[ModelType](
+            items=items,
+            size=params.size,
+            next_cursor=next_cursor,
+            previous_cursor=previous_cursor,
+        )
 
     async def create(
         self,
@@ -145,18 +338,147 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         if created_by_id:
             db_obj.created_by_id = created_by_id
 
+        # Defaults are computed before the INSERT and sessions keep their objects
+        # loaded after commit, so db_obj already holds the stored row
         try:
             db_session.add(db_obj)
             await db_session.commit()
-        except exc.IntegrityError:
-            db_session.rollback()
-            raise HTTPException(
-                status_code=409,
-                detail="Resource already exists",
-            )
-        await db_session.refresh(db_obj)
+        except exc.IntegrityError as error:
+            await db_session.rollback()
+            raise self._conflict(error)
+        await response_cache.invalidate(self.model.__name__)
         return db_obj
 
+    async def create_many(
+        self,
+        *,
+        objs_in: Sequence[CreateSchemaType | ModelType],
+        created_by_id: UUID | str | None = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+        db_session: AsyncSession | None = None,
+    ) -> list[ModelType]:
+        """Insert `objs_in` with one `INSERT ... SELECT unnest(...) RETURNING` per chunk.
+
+        Each column is sent as a single array parameter, so the statement is
+        compiled once whatever the number of rows. All chunks run in a single
+        transaction, nothing is inserted if one fails.
+        """
+        db_session = db_session or self.db.session
+        query = self._insert_unnest().returning(self.model)
+        return await self._insert_chunks(
+            query, self._to_models(objs_in, created_by_id), chunk_size, db_session
+        )
+
+    async def upsert(
+        self,
+        *,
+        obj_in: CreateSchemaType | ModelType,
+        index_elements: Sequence[str | ColumnElement] = ("id",),
+        update_fields: Sequence[str] | None = None,
+        db_session: AsyncSession | None = None,
+    ) -> ModelType | None:
+        """Insert `obj_in` or update the row it conflicts with, see `upsert_many`.
+
+        Returns None when the row already existed and `update_fields` is empty.
+        """
+        upserted = await self.upsert_many(
+            objs_in=[obj_in],
+            index_elements=index_elements,
+            update_fields=update_fields,
+            db_session=db_session,
+        )
+        return upserted[0] if upserted else None
+
+    async def upsert_many(
+        self,
+        *,
+        objs_in: Sequence[CreateSchemaType | ModelType],
+        index_elements: Sequence[str | ColumnElement] = ("id",),
+        update_fields: Sequence[str] | None = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+        db_session: AsyncSession | None = None,
+    ) -> list[ModelType]:
+        """Insert `objs_in` with `INSERT ... ON CONFLICT`, one statement per chunk.
+
+        `index_elements` are the columns or expressions of the unique index to
+        conflict on, e.g. `[func.lower(User.email)]`. Conflicting rows take the
+        incoming values of `update_fields`, by default every column but the
+        conflict columns, `id` and `created_at`; with an empty `update_fields`
+        they are left as they are (`DO NOTHING`). Inserted and updated rows are
+        returned. A chunk must not hold the same key twice.
+        """
+        db_session = db_session or self.db.session
+        query = self._insert_unnest()
+        if update_fields is None:
+            skipped = {
+                "id",
+                "created_at",
+                *(key for key in index_elements if isinstance(key, str)),
+            }
+            update_fields = [
+                key for key in self.model.__table__.columns.keys() if key not in skipped
+            ]
+        if update_fields:
+            query = query.on_conflict_do_update(
+                index_elements=index_elements,
+                set_={field: query.excluded[field] for field in update_fields},
+            )
+        else:
+            query = query.on_conflict_do_nothing(index_elements=index_elements)
+        return await self._insert_chunks(
+            query.returning(self.model), self._to_models(objs_in), chunk_size, db_session
+        )
+
+    def _to_models(
+        self,
+        objs_in: Sequence[CreateSchemaType | ModelType],
+        created_by_id: UUID | str | None = None,
+    ) -> list[ModelType]:
+        db_objs = []
+        for obj_in in objs_in:
+            # Model instances were built by the caller, only schemas need validating
+            db_obj = obj_in if isinstance(obj_in, self.model) else self.model.from_orm(obj_in)
+            if created_by_id:
+                db_obj.created_by_id = created_by_id
+            db_objs.append(db_obj)
+        return db_objs
+
+    def _insert_unnest(self) -> Insert:
+        # Each column is bound as one array, unnested back into rows
+        columns = self.model.__table__.columns
+        rows = select(
+            *(func.unnest(cast(bindparam(column.key), ARRAY(column.type))) for column in columns)
+        )
+        return pg_insert(self.model).from_select(columns.keys(), rows)
+
+    async def _insert_chunks(
+        self,
+        query: Insert,
+        db_objs: list[ModelType],
+        chunk_size: int,
+        db_session: AsyncSession,
+    ) -> list[ModelType]:
+        columns = self.model.__table__.columns
+        inserted = []
+        try:
+            for chunk in self._chunks(db_objs, chunk_size):
+                params = {
+                    column.key: [getattr(obj, column.key) for obj in chunk] for column in columns
+                }
+                response = await db_session.execute(
+                    select(self.model)
+                    .from_statement(query)
+                    .execution_options(populate_existing=True),
+                    params,
+                )
+                inserted.extend(response.scalars().all())
+            await db_session.commit()
+        except exc.IntegrityError as error:
+            await db_session.rollback()
+            raise self._conflict(error)
+        await response_cache.invalidate(self.model.__name__)
+        return inserted
+
     async def update(
         self,
         *,
@@ -173,19 +495,187 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 exclude_unset=True
             )  # This tells Pydantic to not include the values that were not sent
 
+        # Cached copies (role catalog, principal cache) are detached, merge them
+        # so they cannot clash with the same row already loaded in this session
+        if inspect(obj_current).detached:
+            obj_current = await db_session.merge(obj_current, load=False)
+
         for field in update_data:
             setattr(obj_current, field, update_data[field])
 
+        # `updated_at` is set by its onupdate before the UPDATE, no refresh needed
         db_session.add(obj_current)
         await db_session.commit()
-        await db_session.refresh(obj_current)
+        await response_cache.invalidate(self.model.__name__)
         return obj_current
 
+    async def update_by_id(
+        self,
+        *,
+        id: UUID | str,
+        obj_new: UpdateSchemaType | dict[str, Any],
+        db_session: AsyncSession | None = None,
+    ) -> ModelType:
+        """Apply the set fields of `obj_new` to the row `id` with one `UPDATE ... RETURNING`.
+
+        The row is not loaded first; raises `IdNotFoundException` (404) when no
+        row has this id and a 409 when the new values break a unique constraint.
+        """
+        db_session = db_session or self.db.session
+
+        if isinstance(obj_new, dict):
+            update_data = obj_new
+        else:
+            update_data = obj_new.dict(exclude_unset=True)
+
+        query = (
+            update(self.model)
+            .where(self.model.id == id, *self._not_removed())
+            .values(**update_data)
+            .returning(self.model)
+        )
+        try:
+            response = await db_session.execute(
+                select(self.model).from_statement(query).execution_options(populate_existing=True)
+            )
+            db_obj = response.scalar_one_or_none()
+            await db_session.commit()
+        except exc.IntegrityError as error:
+            await db_session.rollback()
+            raise self._conflict(error)
+        if db_obj is None:
+            raise IdNotFoundException(self.model, id=id)
+        await response_cache.invalidate(self.model.__name__)
+        return db_obj
+
+    async def update_many(
+        self,
+        *,
+        obj_new: UpdateSchemaType | dict[str, Any],
+        ids: Sequence[UUID | str] | None = None,
+        where: Sequence[ColumnElement] | None = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+        db_session: AsyncSession | None = None,
+    ) -> list[ModelType]:
+        """Apply the same values to the rows matching `ids` and/or `where`.
+
+        Runs one `UPDATE ... RETURNING` per chunk of `ids` (or a single one for
+        a `where`-only update) in one transaction. Objects already in the
+        session are refreshed with the returned values. Soft-deleted rows are
+        left untouched. Raises a 409 when the new values break a unique
+        constraint.
+        """
+        db_session = db_session or self.db.session
+        if ids is None and not where:
+            raise ValueError("update_many requires ids or where criteria")
+
+        if isinstance(obj_new, dict):
+            update_data = obj_new
+        else:
+            update_data = obj_new.dict(exclude_unset=True)
+
+        query = (
+            update(self.model).where(*(where or []), *self._not_removed()).values(**update_data)
+        )
+        updated = []
+        try:
+            for chunk in self._chunks(ids, chunk_size):
+                chunk_query = query if chunk is None else query.where(self._id_in(chunk))
+                response = await db_session.execute(
+                    select(self.model)
+                    .from_statement(chunk_query.returning(self.model))
+                    .execution_options(populate_existing=True)
+                )
+                updated.extend(response.scalars().all())
+            await db_session.commit()
+        except exc.IntegrityError as error:
+            await db_session.rollback()
+            raise self._conflict(error)
+        await response_cache.invalidate(self.model.__name__)
+        return updated
+
     async def remove(self, *, id: UUID | str, db_session: AsyncSession | None = None) -> ModelType:
+        """Remove the row `id` with one `DELETE ... RETURNING`, see `remove_many`.
+
+        Raises `IdNotFoundException` (404) when no row has this id.
+        """
         db_session = db_session or self.db.session
-        response = await db_session.execute(select(self.model).where(self.model.id == id))
-        obj = response.scalar_one()
+        removed = await self._remove_where(self.model.id == id, db_session=db_session)
+        if not removed:
+            raise IdNotFoundException(self.model, id=id)
+        await db_session.commit()
+        await response_cache.invalidate(self.model.__name__)
+        return removed[0]
 
-        await db_session.delete(obj)
+    async def remove_many(
+        self,
+        *,
+        ids: Sequence[UUID | str],
+        chunk_size: int = BULK_CHUNK_SIZE,
+        db_session: AsyncSession | None = None,
+    ) -> list[ModelType]:
+        """Delete the rows matching `ids` with one `DELETE ... RETURNING` per chunk.
+
+        Rows are not loaded first and relationships are left to the foreign
+        keys' `ON DELETE`. With `soft_delete_field` set, the rows are kept and
+        the field set by an `UPDATE ... RETURNING` instead. Missing (or already
+        removed) ids are ignored; the removed rows are returned.
+        """
+        db_session = db_session or self.db.session
+        removed = []
+        for chunk in self._chunks(ids, chunk_size):
+            removed.extend(await self._remove_where(self._id_in(chunk), db_session=db_session))
         await db_session.commit()
-        return obj
+        await response_cache.invalidate(self.model.__name__)
+        return removed
+
+    async def _remove_where(
+        self, *where: ColumnElement, db_session: AsyncSession
+    ) -> list[ModelType]:
+        if self.soft_delete_field is None:
+            query = delete(self.model).where(*where)
+        else:
+            query = (
+                update(self.model)
+                .where(*where, *self._not_removed())
+                .values({self.soft_delete_field: datetime.utcnow()})
+            )
+        response = await db_session.execute(
+            select(self.model)
+            .from_statement(query.returning(self.model))
+            .execution_options(populate_existing=True)
+        )
+        removed = response.scalars().all()
+        if self.soft_delete_field is None:
+            # The rows are gone, the session must not flush these objects again
+            for obj in removed:
+                db_session.expunge(obj)
+        return removed
+
+    def _select(self) -> Select[ModelType]:
+        return select(self.model).where(*self._not_removed())
+
+    def _not_removed(self) -> list[ColumnElement]:
+        if self.soft_delete_field is None:
+            return []
+        return [self.model.__table__.columns[self.soft_delete_field].is_(None)]
+
+    def _conflict(self, error: exc.IntegrityError) -> HTTPException:
+        # Raised when a write breaks a constraint, models can report which one
+        return HTTPException(
+            status_code=409,
+            detail="Resource already exists",
+        )
+
+    def _id_in(self, ids: Sequence[UUID | str]) -> ColumnElement:
+        # `id = ANY(:ids)` binds one array instead of one parameter per id
+        id_column = self.model.__table__.columns["id"]
+        return id_column == any_(cast(bindparam("ids", list(ids)), ARRAY(id_column.type)))
+
+    @staticmethod
+    def _chunks(items: Sequence[Any] | None, chunk_size: int):
+        if items is None:
+            yield None
+            return
+        for start in range(0, len(items), chunk_size):
+            yield items[start : start + chunk_size]
@@ -1,28 +1,171 @@
+from collections.abc import Sequence
+from typing import Any
 from uuid import UUID
 
-from sqlmodel import select
+from fastapi import HTTPException
+from sqlalchemy import exc
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql.elements import ColumnElement
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.crud.base_crud import CRUDBase
+from app.crud.base_crud import BULK_CHUNK_SIZE, CRUDBase
 from app.models.role_model import Role
 from app.models.user_model import User
 from app.schemas.role_schema import IRoleCreate, IRoleUpdate
+from app.utils.exceptions import NameExistException
+from app.utils.principal_cache import principal_cache
+from app.utils.response_cache import response_cache
+from app.utils.role_catalog import role_catalog
 
 
 class CRUDRole(CRUDBase[Role, IRoleCreate, IRoleUpdate]):
+    load_profiles = {
+        "with_users": [selectinload(Role.users)],
+    }
+
     async def get_role_by_name(self, *, name: str, db_session: AsyncSession | None = None) -> Role:
         db_session = db_session or super().get_db().session
-        role = await db_session.execute(select(Role).where(Role.name == name))
+        role = await db_session.execute(self._select().where(Role.name == name))
         return role.scalar_one_or_none()
 
-    async def add_role_to_user(self, *, user: User, role_id: UUID) -> Role:
-        db_session = super().get_db().session
+    async def create(
+        self,
+        *,
+        obj_in: IRoleCreate | Role,
+        created_by_id: UUID | str | None = None,
+        db_session: AsyncSession | None = None,
+    ) -> Role:
+        role = await super().create(
+            obj_in=obj_in, created_by_id=created_by_id, db_session=db_session
+        )
+        await role_catalog.refresh()
+        return role
+
+    async def create_many(
+        self,
+        *,
+        objs_in: Sequence[IRoleCreate | Role],
+        created_by_id: UUID | str | None = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+        db_session: AsyncSession | None = None,
+    ) -> list[Role]:
+        roles = await super().create_many(
+            objs_in=objs_in,
+            created_by_id=created_by_id,
+            chunk_size=chunk_size,
+            db_session=db_session,
+        )
+        await role_catalog.refresh()
+        return roles
+
+    async def upsert_many(
+        self,
+        *,
+        objs_in: Sequence[IRoleCreate | Role],
+        index_elements: Sequence[str | ColumnElement] = ("id",),
+        update_fields: Sequence[str] | None = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+        db_session: AsyncSession | None = None,
+    ) -> list[Role]:
+        roles = await super().upsert_many(
+            objs_in=objs_in,
+            index_elements=index_elements,
+            update_fields=update_fields,
+            chunk_size=chunk_size,
+            db_session=db_session,
+        )
+        if update_fields is None or update_fields:
+            await principal_cache.invalidate_all()
+        await role_catalog.refresh()
+        return roles
+
+    async def update(
+        self,
+        *,
+        obj_current: Role,
+        obj_new: IRoleUpdate | dict[str, Any] | Role,
+        db_session: AsyncSession | None = None,
+    ) -> Role:
+        role = await super().update(
+            obj_current=obj_current, obj_new=obj_new, db_session=db_session
+        )
+        # Cached principals carry their role, and a role change affects many users
+        await principal_cache.invalidate_all()
+        await role_catalog.refresh()
+        return role
+
+    async def update_by_id(
+        self,
+        *,
+        id: UUID | str,
+        obj_new: IRoleUpdate | dict[str, Any],
+        db_session: AsyncSession | None = None,
+    ) -> Role:
+        role = await super().update_by_id(id=id, obj_new=obj_new, db_session=db_session)
+        await principal_cache.invalidate_all()
+        await role_catalog.refresh()
+        return role
+
+    async def update_many(
+        self,
+        *,
+        obj_new: IRoleUpdate | dict[str, Any],
+        ids: Sequence[UUID | str] | None = None,
+        where: Sequence[ColumnElement] | None = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+        db_session: AsyncSession | None = None,
+    ) -> list[Role]:
+        roles = await super().update_many(
+            obj_new=obj_new, ids=ids, where=where, chunk_size=chunk_size, db_session=db_session
+        )
+        await principal_cache.invalidate_all()
+        await role_catalog.refresh()
+        return roles
+
+    async def remove(self, *, id: UUID | str, db_session: AsyncSession | None = None) -> Role:
+        role = await super().remove(id=id, db_session=db_session)
+        # The foreign key unset the role of its users, cached principals and
+        # user responses still carry it
+        await principal_cache.invalidate_all()
+        await response_cache.invalidate(User.__name__)
+        await role_catalog.refresh()
+        return role
+
+    async def remove_many(
+        self,
+        *,
+        ids: Sequence[UUID | str],
+        chunk_size: int = BULK_CHUNK_SIZE,
+        db_session: AsyncSession | None = None,
+    ) -> list[Role]:
+        roles = await super().remove_many(ids=ids, chunk_size=chunk_size, db_session=db_session)
+        await principal_cache.invalidate_all()
+        await response_cache.invalidate(User.__name__)
+        await role_catalog.refresh()
+        return roles
+
+    def _conflict(self, error: exc.IntegrityError) -> HTTPException:
+        if getattr(error.orig.__cause__, "constraint_name", None) == "ix_Role_name":
+            return NameExistException(Role)
+        return super()._conflict(error)
+
+    async def add_role_to_user(
+        self, *, user: User, role_id: UUID, db_session: AsyncSession | None = None
+    ) -> Role:
+        db_session = db_session or super().get_db().session
 
-        role = await super().get(id=role_id)
-        role.users.append(user)
-        db_session.add(role)
+        role = role_catalog.get_by_id(role_id)
+        if role is not None:
+            role = await db_session.merge(role, load=False)
+        else:
+            role = await super().get(id=role_id, db_session=db_session)
+        # Set the many-to-one side so the role's users are never loaded, the
+        # UPDATE of role_id is then the only statement
+        user.role = role
+        db_session.add(user)
         await db_session.commit()
-        await db_session.refresh(role)
+        await principal_cache.invalidate_user(user.id)
+        await response_cache.invalidate(User.__name__)
         return role
 
 
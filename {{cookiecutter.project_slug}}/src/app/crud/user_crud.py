@@ -1,28 +1,72 @@
+from collections.abc import Sequence
 from typing import Any
+from uuid import UUID
 
+from fastapi import HTTPException
 from pydantic.networks import EmailStr
-from sqlmodel import select
+from sqlalchemy import exc, func, update
+from sqlalchemy.orm import joinedload, lazyload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.sql.base import ExecutableOption
+from sqlalchemy.sql.elements import ColumnElement
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
-from app.crud.base_crud import CRUDBase
+from app.core.security import get_password_hash_async, verify_password_async
+from app.crud.base_crud import BULK_CHUNK_SIZE, CRUDBase
 from app.models.user_model import User
 from app.schemas.user_schema import IUserCreate, IUserUpdate
+from app.utils.exceptions import UserConflictException
+from app.utils.principal_cache import principal_cache
+from app.utils.response_cache import response_cache
+from app.utils.role_catalog import role_catalog
+
+# Unique indexes of "User" and the field reported when an insert violates them
+UNIQUE_FIELDS = {
+    "ix_User_email_lower": "email",
+    "User_username_key": "username",
+}
+
+
+def unique_violation_field(error: exc.IntegrityError) -> str | None:
+    # The asyncpg error raised by the server carries the violated constraint
+    return UNIQUE_FIELDS.get(getattr(error.orig.__cause__, "constraint_name", None))
 
 
 class CRUDUser(CRUDBase[User, IUserCreate, IUserUpdate]):
+    load_profiles = {
+        "with_role": [joinedload(User.role)],
+        "without_role": [lazyload(User.role)],
+    }
+
     async def get_by_email(
-        self, *, email: str, db_session: AsyncSession | None = None
+        self,
+        *,
+        email: str | None,
+        options: Sequence[ExecutableOption] | None = None,
+        load_profile: str | None = None,
+        db_session: AsyncSession | None = None,
     ) -> User | None:
+        """Case-insensitive lookup, served by the unique `ix_User_email_lower` index."""
+        if email is None:
+            return None
         db_session = db_session or super().get_db().session
-        user = await db_session.execute(select(User).where(User.email == email))
+        query = self._select().where(func.lower(User.email) == email.lower())
+        query = self.with_load_options(query, options=options, load_profile=load_profile)
+        user = await db_session.execute(query)
         return user.scalar_one_or_none()
 
     async def get_by_username(
-        self, *, username: str, db_session: AsyncSession | None = None
+        self,
+        *,
+        username: str,
+        options: Sequence[ExecutableOption] | None = None,
+        load_profile: str | None = None,
+        db_session: AsyncSession | None = None,
     ) -> User | None:
         db_session = db_session or super().get_db().session
-        user = await db_session.execute(select(User).where(User.username == username))
+        query = self._select().where(User.username == username)
+        query = self.with_load_options(query, options=options, load_profile=load_profile)
+        user = await db_session.execute(query)
         return user.scalar_one_or_none()
 
     async def create_with_role(
@@ -30,32 +74,142 @@ class CRUDUser(CRUDBase[User, IUserCreate, IUserUpdate]):
     ) -> User:
         db_session = db_session or super().get_db().session
         db_obj = User.from_orm(obj_in)
-        db_obj.hashed_password = get_password_hash(obj_in.password)
+        db_obj.hashed_password = await get_password_hash_async(obj_in.password)
 
-        db_session.add(db_obj)
-        await db_session.commit()
-        await db_session.refresh(db_obj)
+        # The unique indexes decide, a duplicate email or username fails the INSERT itself
+        try:
+            db_session.add(db_obj)
+            await db_session.commit()
+        except exc.IntegrityError as error:
+            await db_session.rollback()
+            field = unique_violation_field(error)
+            if field is None:
+                raise
+            raise UserConflictException(field)
+        # The INSERT sent every column, only the role is missing; the catalog has it
+        role = role_catalog.get_by_id(db_obj.role_id)
+        if role is not None or db_obj.role_id is None:
+            if role is not None:
+                role = await db_session.merge(role, load=False)
+            set_committed_value(db_obj, "role", role)
+        await response_cache.invalidate(User.__name__)
         return db_obj
 
+    async def update_by_id(
+        self,
+        *,
+        id: UUID | str,
+        obj_new: IUserUpdate | dict[str, Any],
+        db_session: AsyncSession | None = None,
+    ) -> User:
+        user = await super().update_by_id(id=id, obj_new=obj_new, db_session=db_session)
+        await principal_cache.invalidate_user(user.id)
+        return user
+
+    async def update(
+        self,
+        *,
+        obj_current: User,
+        obj_new: IUserUpdate | dict[str, Any] | User,
+        db_session: AsyncSession | None = None,
+    ) -> User:
+        user = await super().update(
+            obj_current=obj_current, obj_new=obj_new, db_session=db_session
+        )
+        await principal_cache.invalidate_user(user.id)
+        return user
+
+    async def remove(self, *, id: UUID | str, db_session: AsyncSession | None = None) -> User:
+        user = await super().remove(id=id, db_session=db_session)
+        await principal_cache.invalidate_user(id)
+        return user
+
+    async def upsert_many(
+        self,
+        *,
+        objs_in: Sequence[IUserCreate | User],
+        index_elements: Sequence[str | ColumnElement] = ("id",),
+        update_fields: Sequence[str] | None = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+        db_session: AsyncSession | None = None,
+    ) -> list[User]:
+        users = await super().upsert_many(
+            objs_in=objs_in,
+            index_elements=index_elements,
+            update_fields=update_fields,
+            chunk_size=chunk_size,
+            db_session=db_session,
+        )
+        if update_fields is None or update_fields:
+            await principal_cache.invalidate_users(user.id for user in users)
+        return users
+
+    async def update_many(
+        self,
+        *,
+        obj_new: IUserUpdate | dict[str, Any],
+        ids: Sequence[UUID | str] | None = None,
+        where: Sequence[ColumnElement] | None = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+        db_session: AsyncSession | None = None,
+    ) -> list[User]:
+        users = await super().update_many(
+            obj_new=obj_new, ids=ids, where=where, chunk_size=chunk_size, db_session=db_session
+        )
+        await principal_cache.invalidate_users(user.id for user in users)
+        return users
+
+    async def remove_many(
+        self,
+        *,
+        ids: Sequence[UUID | str],
+        chunk_size: int = BULK_CHUNK_SIZE,
+        db_session: AsyncSession | None = None,
+    ) -> list[User]:
+        users = await super().remove_many(ids=ids, chunk_size=chunk_size, db_session=db_session)
+        await principal_cache.invalidate_users(user.id for user in users)
+        return users
+
+    def _conflict(self, error: exc.IntegrityError) -> HTTPException:
+        field = unique_violation_field(error)
+        return UserConflictException(field) if field else super()._conflict(error)
+
     async def update_is_active(
-        self, *, db_obj: list[User], obj_in: int | str | dict[str, Any]
-    ) -> User | None:
-        db_session = super().get_db().session
+        self,
+        *,
+        db_obj: list[User],
+        obj_in: IUserUpdate | dict[str, Any],
+        db_session: AsyncSession | None = None,
+    ) -> list[User]:
+        is_active = obj_in["is_active"] if isinstance(obj_in, dict) else obj_in.is_active
+        return await self.update_many(
+            obj_new={"is_active": is_active},
+            ids=[user.id for user in db_obj],
+            db_session=db_session,
+        )
 
-        response = None
-        for x in db_obj:
-            x.is_active = obj_in.is_active
-            db_session.add(x)
-            await db_session.commit()
-            await db_session.refresh(x)
-            response.append(x)
-        return response
+    async def update_password(
+        self, *, user: User, hashed_password: str, db_session: AsyncSession | None = None
+    ) -> User:
+        """Store a new password hash with a plain `UPDATE` and no cache invalidation.
+
+        The hash is in no cached response, and callers replace the user's tokens
+        with `store_tokens(..., replace=True)`, whose script already evicts the
+        user from the principal cache of every worker.
+        """
+        db_session = db_session or super().get_db().session
+        await db_session.execute(
+            update(User).where(User.id == user.id).values(hashed_password=hashed_password)
+        )
+        await db_session.commit()
+        user.hashed_password = hashed_password
+        return user
 
     async def authenticate(self, *, email: EmailStr, password: str) -> User | None:
-        user = await self.get_by_email(email=email)
+        user = await self.get_by_email(email=email, load_profile="without_role")
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return None
         return user
 
@@ -0,0 +1,63 @@
+import json
+from collections.abc import Iterator
+from typing import Any
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+class Explain(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON)` of a statement, returning a single JSON row."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Executable, analyze: bool = False) -> None:
+        self.statement = statement
+        self.analyze = analyze
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if element.analyze else "FORMAT JSON"
+    statement = compiler.process(element.statement, **kw)
+    # An explained UPDATE/DELETE/INSERT still returns the plan row, not its RETURNING columns
+    compiler.isinsert = compiler.isupdate = compiler.isdelete = False
+    return f"EXPLAIN ({options}) {statement}"
+
+
+async def explain(
+    db_session: AsyncSession,
+    statement: Executable,
+    analyze: bool = False,
+    params: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    response = await db_session.execute(Explain(statement, analyze=analyze), params)
+    plan = response.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]
+
+
+async def estimate_row_count(db_session: AsyncSession, statement: Executable) -> int:
+    """Rows the planner expects `statement` to return, from table statistics.
+
+    Costs a planning round trip instead of a scan, but is only as accurate as
+    the last `ANALYZE` of the tables involved.
+    """
+    plan = await explain(db_session, statement)
+    return int(plan["Plan"]["Plan Rows"])
+
+
+def plan_nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Every node of an `explain` result, depth first."""
+    nodes = [plan["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        yield node
+        nodes.extend(reversed(node.get("Plans", [])))
+
+
+def sequential_scans(plan: dict[str, Any]) -> list[str]:
+    """Tables read with a sequential scan in an `explain` result."""
+    return [node["Relation Name"] for node in plan_nodes(plan) if node["Node Type"] == "Seq Scan"]
@@ -1,6 +1,12 @@
+import asyncio
+
+from sqlmodel import func, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app import crud
+from app.core.security import get_password_hash_async
+from app.models.role_model import Role
+from app.models.user_model import User
 from app.schemas.role_schema import IRoleCreate
 from app.schemas.user_schema import IUserCreate
 
@@ -48,16 +54,40 @@ users: list[dict[str, str | IUserCreate]] = [
 
 
 async def init_db(db_session: AsyncSession) -> None:
-    for role in roles:
-        role_current = await crud.role.get_role_by_name(name=role.name, db_session=db_session)
-        if not role_current:
-            await crud.role.create(obj_in=role, db_session=db_session)
-
-    for user in users:
-        current_user = await crud.user.get_by_email(
-            email=user["data"].email, db_session=db_session
+    """Create the missing roles and users, leaving existing ones untouched.
+
+    Runs the same handful of statements whatever the number of rows, and
+    only hashes the passwords of the users to create, in parallel.
+    """
+    await crud.role.upsert_many(
+        objs_in=roles, index_elements=["name"], update_fields=[], db_session=db_session
+    )
+    response = await db_session.execute(
+        select(Role.name, Role.id).where(Role.name.in_([role.name for role in roles]))
+    )
+    role_ids = dict(response.all())
+
+    response = await db_session.execute(
+        select(func.lower(User.email)).where(
+            func.lower(User.email).in_([user["data"].email.lower() for user in users])
         )
-        role = await crud.role.get_role_by_name(name=user["role"], db_session=db_session)
-        if not current_user:
-            user["data"].role_id = role.id
-            await crud.user.create_with_role(obj_in=user["data"], db_session=db_session)
+    )
+    existing_emails = set(response.scalars().all())
+    missing = [user for user in users if user["data"].email.lower() not in existing_emails]
+    hashed_passwords = await asyncio.gather(
+        *(get_password_hash_async(user["data"].password) for user in missing)
+    )
+
+    new_users = []
+    for user, hashed_password in zip(missing, hashed_passwords, strict=True):
+        new_user = User.from_orm(user["data"])
+        new_user.hashed_password = hashed_password
+        new_user.role_id = role_ids[user["role"]]
+        new_users.append(new_user)
+    # A user created meanwhile is skipped rather than failing the run
+    await crud.user.upsert_many(
+        objs_in=new_users,
+        index_elements=[func.lower(User.email)],
+        update_fields=[],
+        db_session=db_session,
+    )
@@ -0,0 +1,30 @@
+import redis.asyncio as aioredis
+from redis.asyncio import Redis
+
+from app.core.config import REDIS_PUBSUB_CONNECTIONS, settings
+from app.core.metrics import InstrumentedRedis
+
+
+def create_redis_client(max_connections: int | None = None) -> Redis:
+    """Build a Redis client backed by its own connection pool.
+
+    The application creates one client per worker in the lifespan handler and
+    shares it through `app.state`, so requests never open new sockets. The
+    pool also holds the connections of the pub/sub listeners on top of
+    `max_connections`.
+    """
+    pool = aioredis.BlockingConnectionPool.from_url(
+        f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}",
+        password=settings.REDIS_PASSWORD,
+        max_connections=(max_connections or settings.REDIS_POOL_SIZE) + REDIS_PUBSUB_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+        encoding="utf8",
+        decode_responses=True,
+    )
+    redis_class = InstrumentedRedis if settings.METRICS_ENABLED else Redis
+    return redis_class(connection_pool=pool)
+
+
+async def close_redis_client(redis_client: Redis) -> None:
+    await redis_client.close()
+    await redis_client.connection_pool.disconnect()
@@ -1,22 +1,43 @@
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.config import settings
+from app.core import metrics, query_audit
+from app.core.config import ModeEnum, settings
 
-DB_POOL_SIZE = 83
-WEB_CONCURRENCY = 9
-POOL_SIZE = max(DB_POOL_SIZE // WEB_CONCURRENCY, 5)
 
-connect_args = {"check_same_thread": False}
+def create_db_engine(pooled: bool = True) -> AsyncEngine:
+    """Create an engine configured from `Settings`.
 
-engine = create_async_engine(
-    settings.ASYNC_DB_URI,
-    echo=True,
-    future=True,
-    pool_size=POOL_SIZE,
-    max_overflow=64,
-)
+    One pooled engine is shared by the middleware, `get_db` and scripts;
+    short-lived processes such as alembic pass `pooled=False`.
+    """
+    engine_args = {
+        "echo": settings.DB_ECHO,
+        "future": True,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if pooled:
+        engine_args.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+        if settings.METRICS_ENABLED:
+            engine_args["poolclass"] = metrics.InstrumentedQueuePool
+    else:
+        engine_args["poolclass"] = NullPool
+
+    return create_async_engine(settings.ASYNC_DB_URI, **engine_args)
+
+
+engine = create_db_engine()
+if settings.METRICS_ENABLED:
+    metrics.instrument_engine(engine)
+if settings.MODE != ModeEnum.production:
+    query_audit.instrument_engine(engine)
 
 SessionLocal = sessionmaker(
     autocommit=False,
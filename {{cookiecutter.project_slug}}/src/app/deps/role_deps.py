@@ -2,18 +2,18 @@ from uuid import UUID
 
 from fastapi import Query
 
-from app import crud
 from app.models.role_model import Role
 from app.utils.exceptions.common_exception import (
     IdNotFoundException,
     NameNotFoundException,
 )
+from app.utils.role_catalog import role_catalog
 
 
 async def get_role_by_name(
     role_name: str = Query(default="", description="String compare with name or last name")
 ) -> str:
-    role = await crud.role.get_role_by_name(name=role_name)
+    role = role_catalog.get_by_name(role_name)
     if not role:
         raise NameNotFoundException(Role, name=role_name)
     return role
@@ -22,7 +22,7 @@ async def get_role_by_name(
 async def get_role_by_id(
     role_id: UUID = Query(default="", description="The UUID id of the role")
 ) -> Role:
-    role = await crud.role.get(id=role_id)
+    role = role_catalog.get_by_id(role_id)
     if not role:
         raise IdNotFoundException(Role, id=role_id)
     return role
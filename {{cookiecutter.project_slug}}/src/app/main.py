@@ -2,35 +2,57 @@
 Main FastAPI app instance declaration
 """
 
+from collections.abc import Callable
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_async_sqlalchemy import SQLAlchemyMiddleware
 from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
 from fastapi_pagination import add_pagination
 from loguru import logger
+from redis.asyncio import Redis
 
-from app.api.deps import get_redis_client
+from app.api.responses import FastJSONResponse
 from app.api.v1.api import api_router as api_router_v1
-from app.core.config import load_log_config, settings
+from app.core import metrics
+from app.core.config import ModeEnum, load_log_config, settings
+from app.core.query_audit import QueryAuditMiddleware
+from app.core.security import password_hasher
+from app.db.redis_client import close_redis_client, create_redis_client
+from app.db.session import engine
+from app.utils.principal_cache import principal_cache
+from app.utils.response_cache import ResponseCacheBackend, response_cache
+from app.utils.role_catalog import role_catalog
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting up...")
-    redis_client = await get_redis_client()
-    FastAPICache.init(RedisBackend(redis_client), prefix="fastapi-cache")
+    redis_client = app.state.redis_client_factory()
+    app.state.redis = redis_client
+    FastAPICache.init(ResponseCacheBackend(redis_client), prefix="fastapi-cache")
+    response_cache.start(redis_client)
+    await principal_cache.start(redis_client)
+    await role_catalog.start(redis_client)
 
     yield
 
     logger.info("Shutting down...")
+    await role_catalog.stop()
+    await principal_cache.stop()
     await FastAPICache.clear()
+    response_cache.stop()
+    await close_redis_client(redis_client)
+    password_hasher.shutdown()
+    await engine.dispose()
 
 
 # Initialize the application
-def create_application() -> FastAPI:
+def create_application(
+    default_response_class: type[Response] = FastJSONResponse,
+    redis_client_factory: Callable[[], Redis] = create_redis_client,
+) -> FastAPI:
     load_log_config()
     logger.info("Starting application")
 
@@ -41,18 +63,14 @@ def create_application() -> FastAPI:
         openapi_url="/openapi.json",
         docs_url="/",
         lifespan=lifespan,
+        # FastJSONResponse also enables the single validation pass of FastJSONRoute
+        default_response_class=default_response_class,
     )
 
-    app.add_middleware(
-        SQLAlchemyMiddleware,
-        db_url=settings.ASYNC_DB_URI,
-        engine_args={
-            "echo": False,
-            "pool_pre_ping": True,
-            "pool_size": 4,
-            "max_overflow": 64,
-        },
-    )
+    # Called once per startup, benchmarks pass an in-process stand-in
+    app.state.redis_client_factory = redis_client_factory
+
+    app.add_middleware(SQLAlchemyMiddleware, custom_engine=engine)
 
     # Set all CORS enabled origins
     if settings.BACKEND_CORS_ORIGINS:
@@ -64,6 +82,12 @@ def create_application() -> FastAPI:
             allow_headers=["*"],
         )
 
+    if settings.MODE != ModeEnum.production:
+        app.add_middleware(QueryAuditMiddleware)
+    if settings.METRICS_ENABLED:
+        app.add_middleware(metrics.MetricsMiddleware)
+        app.include_router(metrics.router)
+
     # Include the API router
     app.include_router(api_router_v1, prefix=settings.API_PREFIX)
 
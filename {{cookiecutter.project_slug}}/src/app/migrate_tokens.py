@@ -0,0 +1,22 @@
+import asyncio
+import logging
+
+from app.db.redis_client import close_redis_client, create_redis_client
+from app.utils.token import migrate_legacy_tokens
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    logger.info("Migrating legacy token sets")
+    redis_client = create_redis_client()
+    try:
+        migrated = await migrate_legacy_tokens(redis_client)
+    finally:
+        await close_redis_client(redis_client)
+    logger.info("Migrated %s token sets", migrated)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
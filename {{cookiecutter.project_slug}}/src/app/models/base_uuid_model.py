@@ -18,10 +18,13 @@ class SQLModel(_SQLModel):
 
 
 class BaseUUIDModel(SQLModel):
+    # Server-generated values come back with RETURNING on the INSERT or UPDATE
+    # itself, instead of a SELECT when they are first read
+    __mapper_args__ = {"eager_defaults": True}
+
     id: UUID = Field(
         default_factory=uuid7,
         primary_key=True,
-        index=True,
         nullable=False,
     )
     updated_at: datetime | None = Field(
@@ -1,15 +1,16 @@
-from sqlmodel import Relationship, SQLModel
+from sqlmodel import Field, Relationship, SQLModel
 
 from app.models.base_uuid_model import BaseUUIDModel
 
 
 class RoleBase(SQLModel):
-    name: str
+    name: str = Field(index=True, sa_column_kwargs={"unique": True})
     description: str
 
 
 class Role(BaseUUIDModel, RoleBase, table=True):
     users: list["User"] = Relationship(  # noqa: F821
         back_populates="role",
-        sa_relationship_kwargs={"lazy": "selectin"},
+        # Users are never loaded to delete a role, the foreign key unsets role_id
+        sa_relationship_kwargs={"lazy": "select", "passive_deletes": True},
     )
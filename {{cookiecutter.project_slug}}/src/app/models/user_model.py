@@ -3,6 +3,7 @@ from typing import Optional
 from uuid import UUID
 
 from pydantic import EmailStr
+from sqlalchemy import ForeignKeyConstraint, Index, func, literal_column
 from sqlmodel import Column, DateTime, Field, Relationship, SQLModel
 
 from app.models.base_uuid_model import BaseUUIDModel
@@ -12,16 +13,27 @@ class UserBase(SQLModel):
     first_name: str
     last_name: str
     username: str = Field(nullable=True, sa_column_kwargs={"unique": True})
-    email: EmailStr = Field(nullable=True, index=True, sa_column_kwargs={"unique": True})
+    # Unique case-insensitively, through `ix_User_email_lower`
+    email: EmailStr = Field(nullable=True)
     birthdate: datetime | None = Field(
         sa_column=Column(DateTime(timezone=True), nullable=True)
     )  # birthday with timezone
     phone: str | None
-    role_id: UUID | None = Field(default=None, foreign_key="Role.id")
+    # References "Role", see `User.__table_args__`
+    role_id: UUID | None = Field(default=None, index=True)
 
 
 class User(BaseUUIDModel, UserBase, table=True):
-    hashed_password: str | None = Field(nullable=False, index=True)
+    __table_args__ = (
+        # `get_by_email` (login, register) matches on lower(email)
+        Index("ix_User_email_lower", func.lower(literal_column("email")), unique=True),
+        # `/user/list/by_created_at`, offset and keyset pages ordered by (created_at, id)
+        Index("ix_User_created_at_id", "created_at", "id"),
+        # Deleting a role unsets it on its users in the database, see `Role.users`
+        ForeignKeyConstraint(["role_id"], ["Role.id"], ondelete="SET NULL"),
+    )
+
+    hashed_password: str | None = Field(nullable=False)
     role: Optional["Role"] = Relationship(  # noqa: F821
         back_populates="users",
         sa_relationship_kwargs={"lazy": "joined"},
@@ -1,5 +1,6 @@
 from enum import Enum
 
+from fastapi import Query
 from pydantic import BaseModel
 
 from app.schemas.role_schema import IRoleRead
@@ -14,6 +15,18 @@ class IOrderEnum(str, Enum):
     descendent = "desc"
 
 
+class ICountStrategyEnum(str, Enum):
+    exact = "exact"
+    estimated = "estimated"
+    cached = "cached"
+    none = "none"
+
+
 class TokenType(str, Enum):
     ACCESS = "access_token"
     REFRESH = "refresh_token"
+
+
+class ICursorParams(BaseModel):
+    cursor: str | None = Query(None, description="Cursor returned by the previous request")
+    size: int = Query(50, ge=1, le=100, description="Page size")
@@ -7,12 +7,14 @@ from fastapi_pagination.bases import AbstractPage, AbstractParams
 from pydantic import Field
 from pydantic.generics import GenericModel
 
+from app.schemas.common_schema import ICountStrategyEnum
+
 DataType = TypeVar("DataType")
 T = TypeVar("T")
 
 
 class PageBase(Page[T], Generic[T]):
-    pages: int
+    pages: int | None
     previous_page: int | None = Field(
         None,
         description="Page number of the previous page",
@@ -21,6 +23,23 @@ class PageBase(Page[T], Generic[T]):
         None,
         description="Page number of the next page",
     )
+    count_strategy: ICountStrategyEnum = Field(
+        ICountStrategyEnum.exact,
+        description="How `total` was computed, it is null when the count was omitted",
+    )
+
+
+class CursorPageBase(GenericModel, Generic[T]):
+    items: Sequence[T]
+    size: int
+    next_cursor: str | None = Field(
+        None,
+        description="Cursor of the next page",
+    )
+    previous_cursor: str | None = Field(
+        None,
+        description="Cursor of the previous page",
+    )
 
 
 class IResponseBase(GenericModel, Generic[T]):
@@ -40,14 +59,22 @@ class IGetResponsePaginated(AbstractPage[T], Generic[T]):
     def create(
         cls,
         items: Sequence[T],
-        total: int,
         params: AbstractParams,
+        *,
+        total: int | None = None,
+        count_strategy: ICountStrategyEnum = ICountStrategyEnum.exact,
+        has_next: bool | None = None,
     ) -> PageBase[T] | None:
         if params.size is not None and total is not None and params.size != 0:
             pages = ceil(total / params.size)
+        elif total is None:
+            pages = None
         else:
             pages = 0
 
+        if has_next is None:
+            has_next = pages is not None and params.page < pages
+
         return cls(
             data=PageBase[T](
                 items=items,
@@ -55,8 +82,9 @@ class IGetResponsePaginated(AbstractPage[T], Generic[T]):
                 size=params.size,
                 total=total,
                 pages=pages,
-                next_page=params.page + 1 if params.page < pages else None,
+                next_page=params.page + 1 if has_next else None,
                 previous_page=params.page - 1 if params.page > 1 else None,
+                count_strategy=count_strategy,
             )
         )
 
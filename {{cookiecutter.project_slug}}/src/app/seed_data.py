@@ -0,0 +1,189 @@
+"""
+Seed a large synthetic dataset for capacity tests.
+
+Creates the base data of `app.initial_data`, `--roles` extra roles, and
+`--users` users spread over all of them, with realistic names, unique emails
+and usernames, birthdates, phones and creation dates over the last years.
+Rows are streamed with COPY in chunks of `--chunk-size`, ids come from
+`uuid7_batch` and passwords are `--hashes` bcrypt hashes of `--password`
+computed once in parallel and reused, so every seeded user can log in. Users
+are added on each run, under usernames and emails unique to the run.
+
+Usage:
+    python -m app.seed_data --users 1000000 --roles 20
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import crud
+from app.core.security import get_password_hash_async
+from app.db.init_db import init_db
+from app.db.session import SessionLocal, engine
+from app.models.role_model import Role
+from app.models.user_model import User
+from app.schemas.role_schema import IRoleCreate
+from app.utils.uuid6 import uuid7_batch
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FIRST_NAMES = (
+    "Olivia Liam Emma Noah Amelia Oliver Ava Elijah Sophia Mateo Isabella Lucas Mia Levi "
+    "Charlotte Asher Luna James Evelyn Leo Harper Ethan Sofia Kai Camila Aiden Gianna Daniel "
+    "Aria Henry Ella Sebastian Nora Jack Chloe Samuel Hazel Wei Yuki Aisha Omar Fatima Ivan "
+    "Priya Arjun Chen Hana Diego Lucia Kofi Amara Sven Ingrid Tomasz Zofia"
+).split()
+LAST_NAMES = (
+    "Smith Johnson Williams Brown Jones Garcia Miller Davis Rodriguez Martinez Hernandez Lopez "
+    "Gonzalez Wilson Anderson Thomas Taylor Moore Jackson Martin Lee Perez Thompson White Harris "
+    "Sanchez Clark Ramirez Lewis Robinson Walker Young Allen King Wright Scott Torres Nguyen "
+    "Hill Flores Green Adams Nelson Baker Hall Rivera Campbell Mitchell Carter Roberts Kim Wang "
+    "Tanaka Muller Rossi Kowalski Novak Okafor Singh Haddad Ivanova Larsen"
+).split()
+DOMAINS = ("example.com", "example.org", "example.net", "mail.example.com", "corp.example.com")
+ROLE_NAMES = (
+    "support billing auditor developer analyst sales marketing operations security "
+    "finance legal hr design product research"
+).split()
+USER_COLUMNS = [
+    "id",
+    "first_name",
+    "last_name",
+    "username",
+    "email",
+    "birthdate",
+    "phone",
+    "role_id",
+    "hashed_password",
+    "is_active",
+    "is_superuser",
+    "created_at",
+    "updated_at",
+]
+
+
+async def seed_roles(db_session: AsyncSession, count: int) -> list[uuid.UUID]:
+    await init_db(db_session)
+    names = [
+        ROLE_NAMES[index % len(ROLE_NAMES)]
+        + (f"-{index // len(ROLE_NAMES)}" if index >= len(ROLE_NAMES) else "")
+        for index in range(count)
+    ]
+    await crud.role.upsert_many(
+        objs_in=[IRoleCreate(name=name, description=f"{name.title()} role") for name in names],
+        index_elements=["name"],
+        update_fields=[],
+        db_session=db_session,
+    )
+    response = await db_session.execute(text('SELECT id FROM "Role" ORDER BY name'))
+    return list(response.scalars().all())
+
+
+def user_records(
+    rng: random.Random,
+    run: str,
+    start: int,
+    count: int,
+    role_ids: list[uuid.UUID],
+    hashes: list[str],
+    now: datetime,
+) -> list[tuple]:
+    # Most users get the most common role, as in a real user base
+    role_weights = [len(role_ids)] + [1] * (len(role_ids) - 1)
+    roles = rng.choices(role_ids, weights=role_weights, k=count)
+    records = []
+    for index, user_id, role_id in zip(
+        range(start, start + count), uuid7_batch(count, uuid.UUID), roles, strict=True
+    ):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        handle = f"{first_name}.{last_name}.{run}{index}".lower()
+        created_at = now - timedelta(seconds=rng.randrange(3 * 365 * 24 * 3600))
+        records.append(
+            (
+                user_id,
+                first_name,
+                last_name,
+                handle.replace(".", "_"),
+                f"{handle}@{rng.choice(DOMAINS)}",
+                datetime(1950, 1, 1, tzinfo=timezone.utc)
+                + timedelta(days=rng.randrange(55 * 365)),
+                f"+1{rng.randrange(200, 999)}{rng.randrange(10**7):07d}"
+                if rng.random() < 0.7
+                else None,
+                role_id,
+                hashes[index % len(hashes)],
+                rng.random() < 0.95,
+                False,
+                created_at,
+                created_at
+                + timedelta(seconds=rng.randrange(int((now - created_at).total_seconds()) + 1)),
+            )
+        )
+    return records
+
+
+async def seed_users(
+    users: int,
+    role_ids: list[uuid.UUID],
+    hashes: list[str],
+    chunk_size: int,
+    seed: int | None,
+) -> None:
+    rng = random.Random(seed)
+    run = uuid.uuid4().hex[:6]
+    now = datetime.utcnow()
+    start = time.perf_counter()
+    async with engine.connect() as connection:
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        for offset in range(0, users, chunk_size):
+            count = min(chunk_size, users - offset)
+            records = user_records(rng, run, offset, count, role_ids, hashes, now)
+            await driver_connection.copy_records_to_table(
+                User.__tablename__, records=records, columns=USER_COLUMNS
+            )
+            done = offset + count
+            logger.info(
+                "Copied %s/%s users, %.0f rows/s",
+                done,
+                users,
+                done / (time.perf_counter() - start),
+            )
+        await connection.execute(text(f'ANALYZE "{User.__tablename__}", "{Role.__tablename__}"'))
+        await connection.commit()
+
+
+async def main(args: argparse.Namespace) -> None:
+    logger.info("Hashing %s passwords", args.hashes)
+    hashes = await asyncio.gather(
+        *(get_password_hash_async(args.password) for _ in range(args.hashes))
+    )
+
+    async with SessionLocal() as session:
+        role_ids = await seed_roles(session, args.roles)
+    logger.info("Seeding %s users over %s roles", args.users, len(role_ids))
+    await seed_users(args.users, role_ids, hashes, args.chunk_size, args.seed)
+    await engine.dispose()
+    logger.info("Seed data created")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--roles", type=int, default=10, help="Roles added to the base ones")
+    parser.add_argument("--password", default="qwerty", help="Password of every seeded user")
+    parser.add_argument("--hashes", type=int, default=32, help="Distinct bcrypt hashes reused")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Rows per COPY")
+    parser.add_argument("--seed", type=int, help="Random seed, for a reproducible dataset")
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
@@ -0,0 +1,48 @@
+import time
+from collections import OrderedDict
+
+from app.core.config import settings
+
+
+class CountCache:
+    """Bounded TTL/LRU cache of row counts keyed by compiled count query.
+
+    Entries are per worker and are not invalidated by writes, so a cached
+    total can be stale by up to `ttl` seconds.
+    """
+
+    def __init__(self, maxsize: int, ttl: int) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, int]] = OrderedDict()
+
+    def get(self, key: str) -> int | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, count = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return count
+
+    def set(self, key: str, count: int) -> None:
+        if self.maxsize <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl, count)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+count_cache = CountCache(
+    maxsize=settings.PAGINATION_COUNT_CACHE_SIZE,
+    ttl=settings.PAGINATION_COUNT_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,64 @@
+import base64
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+
+class CursorDirection(str, Enum):
+    next = "next"
+    previous = "prev"
+
+
+class Cursor(BaseModel):
+    """Position of a row in a keyset ordered by `(order column, id)`."""
+
+    value: Any
+    id: UUID
+    direction: CursorDirection = CursorDirection.next
+
+
+def _encode_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, datetime):
+        return {"t": "datetime", "v": value.isoformat()}
+    if isinstance(value, UUID):
+        return {"t": "uuid", "v": str(value)}
+    return {"t": "raw", "v": value}
+
+
+def _decode_value(data: dict[str, Any]) -> Any:
+    if data["t"] == "datetime":
+        return datetime.fromisoformat(data["v"])
+    if data["t"] == "uuid":
+        return UUID(data["v"])
+    return data["v"]
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    payload = {
+        "k": _encode_value(cursor.value),
+        "id": str(cursor.id),
+        "d": cursor.direction.value,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        return Cursor(
+            value=_decode_value(payload["k"]),
+            id=payload["id"],
+            direction=payload["d"],
+        )
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
@@ -13,3 +13,16 @@ class UserSelfDeleteException(HTTPException):
             detail="Users can not delete theirselfs.",
             headers=headers,
         )
+
+
+class UserConflictException(HTTPException):
+    def __init__(
+        self,
+        field: str,
+        headers: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"There is already a user with same {field}",
+            headers=headers,
+        )
@@ -0,0 +1,15 @@
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+
+def copy_columns(instance):
+    """New transient instance of the same class holding only the column values."""
+    mapper = inspect(instance).mapper
+    return mapper.class_(**{attr.key: getattr(instance, attr.key) for attr in mapper.column_attrs})
+
+
+def detached_copy(instance):
+    """Column-only copy that a session can `add` or `merge` like a loaded row."""
+    copy = copy_columns(instance)
+    make_transient_to_detached(copy)
+    return copy
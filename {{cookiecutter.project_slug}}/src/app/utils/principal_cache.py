@@ -0,0 +1,171 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from uuid import UUID
+
+from loguru import logger
+from redis.asyncio import Redis
+from redis.asyncio.client import PubSub
+from redis.exceptions import ConnectionError
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.models.user_model import User
+from app.utils.orm import copy_columns
+
+INVALIDATION_CHANNEL = "principal-cache:invalidate"
+INVALIDATE_ALL = "*"
+# Bulk invalidations of more users clear every cache instead of listing them
+INVALIDATE_USERS_LIMIT = 1_000
+
+
+def _detached_copy(user: User) -> User:
+    """Copy a user and its loaded role into new detached instances.
+
+    Every request gets its own copy, so handlers can attach it to their session
+    (e.g. `crud.user.update`) without touching the cached snapshot.
+    """
+    copy = copy_columns(user)
+    instances = [copy]
+    if "role" not in inspect(user).unloaded:
+        # A loaded empty role is kept too, so it is never lazy loaded detached
+        copy.role = copy_columns(user.role) if user.role is not None else None
+        if copy.role is not None:
+            instances.append(copy.role)
+
+    for instance in instances:
+        make_transient_to_detached(instance)
+    return copy
+
+
+class PrincipalCache:
+    """Bounded TTL/LRU cache of users resolved from access tokens.
+
+    Invalidations are published on a Redis channel so every worker evicts the
+    user, not only the one that handled the write.
+    """
+
+    def __init__(self, maxsize: int, ttl: int) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, User]] = OrderedDict()
+        self._tokens_by_user: dict[str, set[str]] = {}
+        self._redis: Redis | None = None
+        self._pubsub: PubSub | None = None
+        self._listener: asyncio.Task | None = None
+
+    def get(self, token: str) -> User | None:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            self._discard(token)
+            return None
+
+        self._entries.move_to_end(token)
+        return _detached_copy(user)
+
+    def set(self, token: str, user: User) -> None:
+        if self.maxsize <= 0:
+            return
+
+        self._entries[token] = (time.monotonic() + self.ttl, _detached_copy(user))
+        self._entries.move_to_end(token)
+        self._tokens_by_user.setdefault(str(user.id), set()).add(token)
+
+        while len(self._entries) > self.maxsize:
+            oldest_token = next(iter(self._entries))
+            self._discard(oldest_token)
+
+    def evict_user(self, user_id: UUID | str) -> None:
+        for token in self._tokens_by_user.pop(str(user_id), set()):
+            self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tokens_by_user.clear()
+
+    async def invalidate_user(self, user_id: UUID | str) -> None:
+        self.evict_user(user_id)
+        if self._redis is not None:
+            await self._redis.publish(INVALIDATION_CHANNEL, str(user_id))
+
+    async def invalidate_users(self, user_ids: Iterable[UUID | str]) -> None:
+        """Evict several users with a single message to the other workers."""
+        user_ids = [str(user_id) for user_id in user_ids]
+        if len(user_ids) > INVALIDATE_USERS_LIMIT:
+            await self.invalidate_all()
+            return
+
+        for user_id in user_ids:
+            self.evict_user(user_id)
+        if self._redis is not None and user_ids:
+            await self._redis.publish(INVALIDATION_CHANNEL, ",".join(user_ids))
+
+    async def invalidate_all(self) -> None:
+        self.clear()
+        if self._redis is not None:
+            await self._redis.publish(INVALIDATION_CHANNEL, INVALIDATE_ALL)
+
+    async def start(self, redis_client: Redis) -> None:
+        self._redis = redis_client
+        self._pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(INVALIDATION_CHANNEL)
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(INVALIDATION_CHANNEL)
+            await self._pubsub.close()
+            self._pubsub = None
+        self._redis = None
+        self.clear()
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    if message["data"] == INVALIDATE_ALL:
+                        self.clear()
+                    else:
+                        for user_id in message["data"].split(","):
+                            self.evict_user(user_id)
+            except ConnectionError:
+                # We may have missed invalidations while disconnected
+                logger.warning("Principal cache lost its Redis subscription, retrying")
+            except Exception:
+                # A bad message must not stop the listener
+                logger.exception("Principal cache listener failed, retrying")
+            self.clear()
+            await asyncio.sleep(1)
+
+    def _discard(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+
+        user_id = str(entry[1].id)
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,127 @@
+from collections import defaultdict
+from collections.abc import Callable
+from functools import partial, wraps
+from typing import Any, get_type_hints
+
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.decorator import cache
+from pydantic import parse_obj_as
+from redis.asyncio import Redis
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import settings
+
+GENERATION_KEY = "response-cache:generation:{namespace}"
+
+
+class ResponseCache:
+    """Generation counters and hit/miss statistics for cached GET responses.
+
+    Cache keys embed the current generation of every model the response reads.
+    `CRUDBase` writes bump the generation of their model after committing, so
+    entries cached before the write are never served again and simply expire.
+    """
+
+    def __init__(self) -> None:
+        self._redis: Redis | None = None
+        self.stats: defaultdict[str, dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0}
+        )
+
+    def start(self, redis_client: Redis) -> None:
+        self._redis = redis_client
+
+    def stop(self) -> None:
+        self._redis = None
+
+    async def generations(self, namespaces: list[str]) -> list[int]:
+        keys = [GENERATION_KEY.format(namespace=namespace) for namespace in namespaces]
+        return [int(generation or 0) for generation in await self._redis.mget(keys)]
+
+    async def invalidate(self, *namespaces: str) -> None:
+        if self._redis is None:
+            return
+
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for namespace in namespaces:
+                pipe.incr(GENERATION_KEY.format(namespace=namespace))
+            await pipe.execute()
+
+    def record(self, namespace: str, hit: bool) -> None:
+        self.stats[namespace]["hits" if hit else "misses"] += 1
+
+
+response_cache = ResponseCache()
+
+
+class ResponseCacheBackend(RedisBackend):
+    """`RedisBackend` that counts hits and misses per cache namespace."""
+
+    async def get_with_ttl(self, key: str) -> tuple[int, str | None]:
+        ttl, value = await super().get_with_ttl(key)
+        # Keys are "<prefix>:<models>:...", see `response_key_builder`
+        response_cache.record(key.split(":", 2)[1], hit=value is not None)
+        return ttl, value
+
+
+async def response_key_builder(
+    func: Callable[..., Any],
+    namespace: str = "",
+    request: Request | None = None,
+    response: Response | None = None,
+    args: tuple = (),
+    kwargs: dict[str, Any] | None = None,
+    per_user: bool = False,
+) -> str:
+    """Key on the model generations, the caller's role (and id) and the URL."""
+    generations = await response_cache.generations(namespace.split(","))
+
+    user = (kwargs or {}).get("current_user")
+    role = user.role.name if user is not None and user.role is not None else "-"
+    user_id = str(user.id) if user is not None and per_user else "-"
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+
+    return ":".join(
+        [
+            FastAPICache.get_prefix(),
+            namespace,
+            ".".join(str(generation) for generation in generations),
+            role,
+            user_id,
+            f"{func.__module__}.{func.__name__}",
+            f"{request.url.path}?{query}",
+        ]
+    )
+
+
+def cached(
+    *models: str, expire: int | None = None, per_user: bool = False
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Cache a GET endpoint with fastapi-cache until one of `models` is written.
+
+    `models` are the model class names the response is built from, e.g.
+    `cached("Role")`. Entries vary by the role of `current_user`, and also by
+    the user itself with `per_user=True`. The result is validated against the
+    endpoint's return annotation before being stored, so only fields of the
+    response schema ever reach Redis.
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        response_model = get_type_hints(func)["return"]
+
+        @wraps(func)
+        async def validated(*args: Any, **kwargs: Any) -> Any:
+            content = await func(*args, **kwargs)
+            if isinstance(content, Response):
+                return content
+            return parse_obj_as(response_model, content)
+
+        return cache(
+            expire=expire or settings.RESPONSE_CACHE_EXPIRE_SECONDS,
+            namespace=",".join(models),
+            key_builder=partial(response_key_builder, per_user=per_user),
+        )(validated)
+
+    return decorator
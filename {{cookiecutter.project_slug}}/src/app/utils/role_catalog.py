@@ -0,0 +1,130 @@
+import asyncio
+from typing import NamedTuple
+from uuid import UUID
+
+from loguru import logger
+from redis.asyncio import Redis
+from redis.asyncio.client import PubSub
+from redis.exceptions import ConnectionError
+from sqlmodel import select
+
+from app.db.session import SessionLocal
+from app.models.role_model import Role
+from app.utils.orm import detached_copy
+
+VERSION_KEY = "role-catalog:version"
+CHANGED_CHANNEL = "role-catalog:changed"
+
+
+class _Snapshot(NamedTuple):
+    version: int
+    roles: tuple[Role, ...]
+    by_id: dict[UUID, Role]
+    by_name: dict[str, Role]
+
+
+_EMPTY = _Snapshot(version=0, roles=(), by_id={}, by_name={})
+
+
+class RoleCatalog:
+    """In-process copy of the `Role` table, indexed by id and by name.
+
+    Lookups never do I/O. Writes through `crud.role` call `refresh`, which bumps
+    a version counter in Redis and announces it, so every worker reloads the
+    roles and swaps its snapshot in one assignment. Returned roles are detached
+    copies, safe to add to a session.
+    """
+
+    def __init__(self) -> None:
+        self._snapshot = _EMPTY
+        self._redis: Redis | None = None
+        self._pubsub: PubSub | None = None
+        self._listener: asyncio.Task | None = None
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def get_by_id(self, id: UUID | str | None) -> Role | None:
+        if id is None:
+            return None
+        role = self._snapshot.by_id.get(id if isinstance(id, UUID) else UUID(str(id)))
+        return detached_copy(role) if role is not None else None
+
+    def get_by_name(self, name: str) -> Role | None:
+        role = self._snapshot.by_name.get(name)
+        return detached_copy(role) if role is not None else None
+
+    def get_all(self) -> list[Role]:
+        return [detached_copy(role) for role in self._snapshot.roles]
+
+    async def load(self, version: int | None = None) -> None:
+        if version is None:
+            version = int(await self._redis.get(VERSION_KEY) or 0) if self._redis else 0
+
+        async with SessionLocal() as session:
+            response = await session.execute(select(Role).order_by(Role.id))
+            roles = tuple(detached_copy(role) for role in response.scalars().all())
+
+        self._snapshot = _Snapshot(
+            version=version,
+            roles=roles,
+            by_id={role.id: role for role in roles},
+            by_name={role.name: role for role in roles},
+        )
+
+    async def refresh(self) -> None:
+        """Reload after a role write and tell the other workers to do the same."""
+        if self._redis is None:
+            return
+
+        version = await self._redis.incr(VERSION_KEY)
+        await self.load(version)
+        await self._redis.publish(CHANGED_CHANNEL, version)
+
+    async def start(self, redis_client: Redis) -> None:
+        self._redis = redis_client
+        # Subscribe before loading so no change can fall in between
+        self._pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(CHANGED_CHANNEL)
+        await self.load()
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(CHANGED_CHANNEL)
+            await self._pubsub.close()
+            self._pubsub = None
+        self._redis = None
+        self._snapshot = _EMPTY
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    version = int(message["data"])
+                    if version != self._snapshot.version:
+                        await self.load(version)
+            except ConnectionError:
+                # We may have missed changes while disconnected
+                logger.warning("Role catalog lost its Redis subscription, reloading")
+            except Exception:
+                # A bad message or a failed load must not stop the listener
+                logger.exception("Role catalog listener failed, reloading")
+            await asyncio.sleep(1)
+            try:
+                await self.load()
+            except Exception:
+                logger.exception("Role catalog reload failed")
+
+
+role_catalog = RoleCatalog()
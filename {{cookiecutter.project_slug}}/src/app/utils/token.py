@@ -1,10 +1,140 @@
+import time
 from datetime import timedelta
 from uuid import UUID
 
+import jwt
 from redis.asyncio import Redis
 
+from app.core.config import settings
 from app.models.user_model import User
 from app.schemas.common_schema import TokenType
+from app.utils.principal_cache import INVALIDATION_CHANNEL, principal_cache
+
+# Tokens live in a sorted set per user and type, scored by their expiry as a
+# unix timestamp. Membership is a single ZSCORE and expired members are pruned
+# lazily whenever a new token is added. Every flow runs as one script so each
+# auth endpoint costs a single Redis round trip.
+_LUA_HELPERS = """
+local function is_tracked(key, now)
+    return redis.call('ZCOUNT', key, '(' .. now, '+inf') > 0
+end
+
+local function is_valid(key, token, now)
+    local score = redis.call('ZSCORE', key, token)
+    if score and tonumber(score) > now then
+        return true
+    end
+    return not is_tracked(key, now)
+end
+
+local function add_token(key, expires_at, token, now)
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now)
+    redis.call('ZADD', key, expires_at, token)
+    local last = redis.call('ZRANGE', key, -1, -1, 'WITHSCORES')
+    redis.call('EXPIREAT', key, math.ceil(tonumber(last[2])))
+end
+"""
+
+# ARGV: now, only_if_tracked, replace, channel, user_id, then an
+# (expires_at, token) pair for every key.
+STORE_TOKENS_SCRIPT = (
+    _LUA_HELPERS
+    + """
+local now = tonumber(ARGV[1])
+local only_if_tracked = ARGV[2] == '1'
+local replace = ARGV[3] == '1'
+for i, key in ipairs(KEYS) do
+    if replace then
+        redis.call('DEL', key)
+    end
+    if not only_if_tracked or is_tracked(key, now) then
+        add_token(key, ARGV[4 + 2 * i], ARGV[5 + 2 * i], now)
+    end
+end
+if replace then
+    redis.call('PUBLISH', ARGV[4], ARGV[5])
+end
+return 1
+"""
+)
+
+# Returns 1 when the token is allowed: either it is stored and not expired, or
+# the user has no unexpired tokens stored at all.
+IS_VALID_TOKEN_SCRIPT = (
+    _LUA_HELPERS
+    + """
+if is_valid(KEYS[1], ARGV[2], tonumber(ARGV[1])) then
+    return 1
+end
+return 0
+"""
+)
+
+# KEYS: refresh key, access key. ARGV: now, refresh_token, expires_at, access_token
+REFRESH_ACCESS_TOKEN_SCRIPT = (
+    _LUA_HELPERS
+    + """
+local now = tonumber(ARGV[1])
+if not is_valid(KEYS[1], ARGV[2], now) then
+    return 0
+end
+if is_tracked(KEYS[2], now) then
+    add_token(KEYS[2], ARGV[3], ARGV[4], now)
+end
+return 1
+"""
+)
+
+# Old `user:{id}:{type}` sets were keyed with the formatted enum, which depends
+# on the Python version (`TokenType.ACCESS` on 3.11, `access_token` before).
+LEGACY_TOKEN_KEY_SUFFIXES = {
+    suffix: token_type
+    for token_type in TokenType
+    for suffix in (str(token_type), token_type.value)
+}
+
+
+def get_token_key(user_id: UUID | str, token_type: TokenType) -> str:
+    return f"tokens:{user_id}:{TokenType(token_type).value}"
+
+
+def get_default_expire_time(token_type: TokenType) -> int:
+    if token_type == TokenType.REFRESH:
+        return settings.REFRESH_TOKEN_EXPIRE_MINUTES
+    return settings.ACCESS_TOKEN_EXPIRE_MINUTES
+
+
+def get_expires_at(now: float, token_type: TokenType, expire_time: int | None = None) -> float:
+    expire_time = expire_time or get_default_expire_time(token_type)
+    return now + timedelta(minutes=expire_time).total_seconds()
+
+
+async def store_tokens(
+    redis_client: Redis,
+    user_id: UUID | str,
+    tokens: dict[TokenType, str],
+    *,
+    only_if_tracked: bool = False,
+    replace: bool = False,
+) -> None:
+    """Store several tokens of a user in one round trip.
+
+    With `only_if_tracked` a token is only stored when the user already has
+    unexpired tokens of that type. With `replace` the existing tokens are
+    dropped first and the principal cache is invalidated on every worker.
+    """
+    if replace:
+        principal_cache.evict_user(user_id)
+
+    now = time.time()
+    keys = []
+    args = [now, int(only_if_tracked), int(replace), INVALIDATION_CHANNEL, str(user_id)]
+    for token_type, token in tokens.items():
+        keys.append(get_token_key(user_id, token_type))
+        args.extend([get_expires_at(now, token_type), token])
+
+    script = redis_client.register_script(STORE_TOKENS_SCRIPT)
+    await script(keys=keys, args=args)
 
 
 async def add_token_to_redis(
@@ -14,21 +144,84 @@ async def add_token_to_redis(
     token_type: TokenType,
     expire_time: int | None = None,
 ) -> None:
-    token_key = f"user:{user.id}:{token_type}"
-    valid_tokens = await get_valid_tokens(redis_client, user.id, token_type)
-    await redis_client.sadd(token_key, token)
-    if not valid_tokens:
-        await redis_client.expire(token_key, timedelta(minutes=expire_time))
+    now = time.time()
+    expires_at = get_expires_at(now, token_type, expire_time)
+    script = redis_client.register_script(STORE_TOKENS_SCRIPT)
+    await script(
+        keys=[get_token_key(user.id, token_type)],
+        args=[now, 0, 0, INVALIDATION_CHANNEL, str(user.id), expires_at, token],
+    )
 
 
 async def get_valid_tokens(redis_client: Redis, user_id: UUID, token_type: TokenType) -> set:
-    token_key = f"user:{user_id}:{token_type}"
-    valid_tokens = await redis_client.smembers(token_key)
-    return valid_tokens
+    token_key = get_token_key(user_id, token_type)
+    valid_tokens = await redis_client.zrangebyscore(token_key, f"({time.time()}", "+inf")
+    return set(valid_tokens)
+
+
+async def is_token_valid(
+    redis_client: Redis, user_id: UUID | str, token: str, token_type: TokenType
+) -> bool:
+    is_valid = redis_client.register_script(IS_VALID_TOKEN_SCRIPT)
+    result = await is_valid(keys=[get_token_key(user_id, token_type)], args=[time.time(), token])
+    return bool(result)
+
+
+async def refresh_access_token(
+    redis_client: Redis, user_id: UUID | str, refresh_token: str, access_token: str
+) -> bool:
+    """Check the refresh token and store the new access token atomically.
+
+    Returns False when the refresh token is not allowed, in which case the
+    access token is not stored.
+    """
+    now = time.time()
+    script = redis_client.register_script(REFRESH_ACCESS_TOKEN_SCRIPT)
+    result = await script(
+        keys=[
+            get_token_key(user_id, TokenType.REFRESH),
+            get_token_key(user_id, TokenType.ACCESS),
+        ],
+        args=[now, refresh_token, get_expires_at(now, TokenType.ACCESS), access_token],
+    )
+    return bool(result)
 
 
 async def delete_tokens(redis_client: Redis, user: User, token_type: TokenType) -> None:
-    token_key = f"user:{user.id}:{token_type}"
-    valid_tokens = await redis_client.smembers(token_key)
-    if valid_tokens is not None:
-        await redis_client.delete(token_key)
+    await redis_client.delete(get_token_key(user.id, token_type))
+    await principal_cache.invalidate_user(user.id)
+
+
+async def migrate_legacy_tokens(redis_client: Redis) -> int:
+    """Move tokens from the old `user:{id}:{type}` sets into sorted sets.
+
+    Each token is scored by its `exp` claim; tokens that already expired are
+    dropped. Returns the number of legacy keys migrated.
+    """
+    now = time.time()
+    migrated = 0
+    for suffix, token_type in LEGACY_TOKEN_KEY_SUFFIXES.items():
+        async for legacy_key in redis_client.scan_iter(match=f"user:*:{suffix}", count=1000):
+            if await redis_client.type(legacy_key) != "set":
+                continue
+
+            user_id = legacy_key.split(":")[1]
+            scores = {}
+            for token in await redis_client.smembers(legacy_key):
+                try:
+                    payload = jwt.decode(token, options={"verify_signature": False})
+                except jwt.PyJWTError:
+                    continue
+                if payload.get("exp", 0) > now:
+                    scores[token] = payload["exp"]
+
+            async with redis_client.pipeline(transaction=True) as pipe:
+                if scores:
+                    token_key = get_token_key(user_id, token_type)
+                    pipe.zadd(token_key, scores)
+                    pipe.expireat(token_key, int(max(scores.values())) + 1)
+                pipe.delete(legacy_key)
+                await pipe.execute()
+            migrated += 1
+
+    return migrated
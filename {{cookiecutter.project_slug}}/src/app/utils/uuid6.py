@@ -4,11 +4,21 @@ generating version 6 and 7 UUIDs as specified in
 https://github.com/uuid6/uuid6-ietf-draft.
 
 Repo: https://github.com/oittaa/uuid6-python
+
+The generators are thread-safe: the last timestamp is kept behind a lock, and
+uuid7() takes its random bits from values drawn from the OS in blocks rather
+than per id. uuid7_batch() builds many ids under a single lock acquisition.
 """
 
+import os
 import secrets
+import struct
+import threading
 import time
 import uuid
+from typing import TypeVar
+
+UUIDType = TypeVar("UUIDType", bound=uuid.UUID)
 
 
 class UUID(uuid.UUID):
@@ -71,8 +81,30 @@ def _subsec_encode(value: int) -> int:
     return value * 2**20 // 10**6
 
 
+_new = object.__new__
+_setattr = object.__setattr__
+_SAFE_UNKNOWN = uuid.SafeUUID.unknown
+
+
+def _from_int(uuid_class: type[UUIDType], value: int) -> UUIDType:
+    # What uuid.UUID.__init__ ends up doing for `int=`, without the argument checks
+    obj = _new(uuid_class)
+    _setattr(obj, "int", value)
+    _setattr(obj, "is_safe", _SAFE_UNKNOWN)
+    return obj
+
+
 _last_v6_timestamp = None
-_last_v7_timestamp = None
+_v6_lock = threading.Lock()
+
+# Unix time in milliseconds shifted left by the 20 subsec bits of the last uuid7
+_last_v7_timestamp = -1
+_v7_lock = threading.Lock()
+
+_UUID7_VERSION_AND_VARIANT = 7 << 76 | 0x8000 << 48
+# 64-bit random values, drawn from the OS in blocks of 512 and consumed from the end
+_RANDOM_BLOCK = struct.Struct(">512Q")
+_random_values: list[int] = []
 
 
 def uuid6(clock_seq: int | None = None) -> UUID:
@@ -89,9 +121,10 @@ def uuid6(clock_seq: int | None = None) -> UUID:
     # 0x01b21dd213814000 is the number of 100-ns intervals between the
     # UUID epoch 1582-10-15 00:00:00 and the Unix epoch 1970-01-01 00:00:00.
     timestamp = nanoseconds // 100 + 0x01B21DD213814000
-    if _last_v6_timestamp is not None and timestamp <= _last_v6_timestamp:
-        timestamp = _last_v6_timestamp + 1
-    _last_v6_timestamp = timestamp
+    with _v6_lock:
+        if _last_v6_timestamp is not None and timestamp <= _last_v6_timestamp:
+            timestamp = _last_v6_timestamp + 1
+        _last_v6_timestamp = timestamp
     if clock_seq is None:
         clock_seq = secrets.randbits(14)  # instead of stable storage
     node = secrets.randbits(48)
@@ -104,28 +137,73 @@ def uuid6(clock_seq: int | None = None) -> UUID:
     return UUID(int=uuid_int, version=6)
 
 
-def uuid7() -> UUID:
+def _v7_timestamp() -> int:
+    timestamp_ms, timestamp_ns = divmod(time.time_ns(), 10**6)
+    return (timestamp_ms & 0xFFFFFFFFFFFF) << 20 | _subsec_encode(timestamp_ns)
+
+
+def _refill_random_values(count: int) -> None:
+    for _ in range(-(-count // 512)):
+        _random_values.extend(_RANDOM_BLOCK.unpack(os.urandom(_RANDOM_BLOCK.size)))
+
+
+def _v7_int(timestamp: int, rand: int) -> int:
+    return (
+        (timestamp >> 20) << 80
+        | (timestamp >> 8 & 0x0FFF) << 64
+        | (timestamp & 0xFF) << 54
+        | rand >> 10
+        | _UUID7_VERSION_AND_VARIANT
+    )
+
+
+def uuid7(uuid_class: type[UUIDType] = UUID) -> UUIDType:
     r"""UUID version 7 features a time-ordered value field derived from the
     widely implemented and well known Unix Epoch timestamp source, the
     number of milliseconds seconds since midnight 1 Jan 1970 UTC, leap
     seconds excluded.  As well as improved entropy characteristics over
     versions 1 or 6.
     Implementations SHOULD utilize UUID version 7 over UUID version 1 and
-    6 if possible."""
+    6 if possible.
+    The 48-bit millisecond timestamp and the 20-bit subsec fraction form a
+    counter bumped by one whenever the clock has not moved on, so ids are
+    strictly increasing across threads; the other 54 bits are random.
+    Pass 'uuid_class=uuid.UUID' to get a plain standard library UUID."""
 
     global _last_v7_timestamp
 
-    nanoseconds = time.time_ns()
-    if _last_v7_timestamp is not None and nanoseconds <= _last_v7_timestamp:
-        nanoseconds = _last_v7_timestamp + 1
-    _last_v7_timestamp = nanoseconds
-    timestamp_ms, timestamp_ns = divmod(nanoseconds, 10**6)
-    subsec = _subsec_encode(timestamp_ns)
-    subsec_a = subsec >> 8
-    subsec_b = subsec & 0xFF
-    rand = secrets.randbits(54)
-    uuid_int = (timestamp_ms & 0xFFFFFFFFFFFF) << 80
-    uuid_int |= subsec_a << 64
-    uuid_int |= subsec_b << 54
-    uuid_int |= rand
-    return UUID(int=uuid_int, version=7)
+    timestamp = _v7_timestamp()
+    with _v7_lock:
+        if timestamp <= _last_v7_timestamp:
+            timestamp = _last_v7_timestamp + 1
+        _last_v7_timestamp = timestamp
+        if not _random_values:
+            _refill_random_values(1)
+        rand = _random_values.pop()
+
+    if uuid_class is UUID or uuid_class is uuid.UUID:
+        return _from_int(uuid_class, _v7_int(timestamp, rand))
+    return uuid_class(int=_v7_int(timestamp, rand))
+
+
+def uuid7_batch(count: int, uuid_class: type[UUIDType] = UUID) -> list[UUIDType]:
+    r"""`count` strictly increasing version 7 UUIDs, e.g. the ids of a bulk insert."""
+
+    global _last_v7_timestamp
+
+    if count <= 0:
+        return []
+    timestamp = _v7_timestamp()
+    with _v7_lock:
+        if timestamp <= _last_v7_timestamp:
+            timestamp = _last_v7_timestamp + 1
+        _last_v7_timestamp = timestamp + count - 1
+        if len(_random_values) < count:
+            _refill_random_values(count - len(_random_values))
+        randoms = _random_values[len(_random_values) - count :]
+        del _random_values[len(_random_values) - count :]
+
+    values = [_v7_int(timestamp + index, rand) for index, rand in enumerate(randoms)]
+    if uuid_class is UUID or uuid_class is uuid.UUID:
+        return [_from_int(uuid_class, value) for value in values]
+    return [uuid_class(int=value) for value in values]
@@ -0,0 +1,100 @@
+"""
+Per-row CRUDBase create/update/remove versus the set-based *_many methods.
+
+Usage:
+    python -m benchmarks.bulk_crud --rows 10000
+"""
+
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from app import crud
+from app.db.session import SessionLocal, engine
+from app.models.role_model import Role
+from app.models.user_model import User
+from benchmarks.common import HASHED_PASSWORD, drop_role, seed_role
+
+
+def build_users(role: Role, rows: int) -> list[User]:
+    return [
+        User(
+            first_name="Bench",
+            last_name="Mark",
+            email=f"{uuid4().hex}@example.com",
+            username=uuid4().hex,
+            hashed_password=HASHED_PASSWORD,
+            role_id=role.id,
+        )
+        for _ in range(rows)
+    ]
+
+
+async def per_row(role: Role, rows: int) -> dict[str, float]:
+    timings = {}
+    new_users = build_users(role, rows)
+    async with SessionLocal() as session:
+        start = time.perf_counter()
+        users = [await crud.user.create(obj_in=user, db_session=session) for user in new_users]
+        timings["create"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for user in users:
+            await crud.user.update(
+                obj_current=user, obj_new={"is_active": False}, db_session=session
+            )
+        timings["update"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for user in users:
+            await crud.user.remove(id=user.id, db_session=session)
+        timings["remove"] = time.perf_counter() - start
+    return timings
+
+
+async def bulk(role: Role, rows: int) -> dict[str, float]:
+    timings = {}
+    new_users = build_users(role, rows)
+    async with SessionLocal() as session:
+        start = time.perf_counter()
+        users = await crud.user.create_many(objs_in=new_users, db_session=session)
+        timings["create"] = time.perf_counter() - start
+
+        ids = [user.id for user in users]
+        start = time.perf_counter()
+        await crud.user.update_many(obj_new={"is_active": False}, ids=ids, db_session=session)
+        timings["update"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await crud.user.remove_many(ids=ids, db_session=session)
+        timings["remove"] = time.perf_counter() - start
+    return timings
+
+
+async def main(rows: int) -> None:
+    async with SessionLocal() as session:
+        role = await seed_role(session)
+
+    try:
+        row_timings = await per_row(role, rows)
+        bulk_timings = await bulk(role, rows)
+    finally:
+        async with SessionLocal() as session:
+            await drop_role(session, role)
+        await engine.dispose()
+
+    print(f"{'operation':<10} {'per row':>10} {'bulk':>10} {'speedup':>9}")
+    for operation, elapsed in row_timings.items():
+        bulk_elapsed = bulk_timings[operation]
+        print(
+            f"{operation:<10} {elapsed:>9.2f}s {bulk_elapsed:>9.2f}s "
+            f"{elapsed / bulk_elapsed:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows))
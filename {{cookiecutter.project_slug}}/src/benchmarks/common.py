@@ -0,0 +1,55 @@
+import statistics
+from uuid import uuid4
+
+from sqlalchemy import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.security import get_password_hash
+from app.models.role_model import Role
+from app.models.user_model import User
+from app.utils.uuid6 import uuid7_batch
+
+PASSWORD = "benchmark"
+# Hashed once, so seeded users can log in without paying bcrypt per row
+HASHED_PASSWORD = get_password_hash(PASSWORD)
+
+
+async def seed_role(session: AsyncSession) -> Role:
+    role = Role(name=f"benchmark-{uuid4().hex[:8]}", description="Benchmark role")
+    session.add(role)
+    await session.commit()
+    return role
+
+
+async def seed_users(
+    session: AsyncSession, role: Role, count: int, chunk_size: int = 10_000
+) -> list[dict]:
+    rows = [
+        {
+            "id": user_id,
+            "first_name": "Bench",
+            "last_name": "Mark",
+            "email": f"{uuid4().hex}@example.com",
+            "username": uuid4().hex,
+            "hashed_password": HASHED_PASSWORD,
+            "role_id": role.id,
+            "is_active": True,
+            "is_superuser": False,
+        }
+        for user_id in uuid7_batch(count)
+    ]
+    for start in range(0, count, chunk_size):
+        await session.execute(insert(User), rows[start : start + chunk_size])
+    await session.commit()
+    return rows
+
+
+async def drop_role(session: AsyncSession, role: Role) -> None:
+    await session.execute(User.__table__.delete().where(User.role_id == role.id))
+    await session.execute(Role.__table__.delete().where(Role.id == role.id))
+    await session.commit()
+
+
+def percentiles(latencies: list[float]) -> dict[str, float]:
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {"p50": quantiles[49], "p95": quantiles[94], "p99": quantiles[98]}
@@ -0,0 +1,201 @@
+"""
+Load test of the main endpoints, with results as JSON comparable between commits.
+
+Seeds a role and `--users` users, then drives each scenario with
+`--concurrency` clients for `--requests` requests (`--auth-requests` for the
+bcrypt-bound login scenarios) and reports throughput and p50/p95/p99 latency.
+By default the app runs in-process (through httpx's ASGI transport, so HTTP
+parsing and the network are not measured) against the configured Postgres,
+with fakeredis standing in for Redis, so no other service is needed. Pass
+`--url` to load a running server instead; users are still seeded through the
+configured database.
+
+Run with MODE=production for representative numbers, the development query
+audit captures a stack per statement.
+
+Usage:
+    python -m benchmarks.load --concurrency 16 --requests 2000 --output bench.json
+    python -m benchmarks.load --compare bench-main.json bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import Any
+
+import httpx
+from fakeredis.aioredis import FakeRedis
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.main import create_application
+from benchmarks.common import PASSWORD, drop_role, percentiles, seed_role, seed_users
+
+WARMUP_REQUESTS = 20
+
+Request = Callable[[httpx.AsyncClient], Any]
+
+
+def scenarios(email: str, headers: dict[str, str]) -> dict[str, Request]:
+    prefix = settings.API_PREFIX
+    credentials = {"email": email, "password": PASSWORD}
+    form = {"username": email, "password": PASSWORD}
+    return {
+        "auth_login": lambda client: client.post(f"{prefix}/auth/login", json=credentials),
+        "auth_token": lambda client: client.post(f"{prefix}/auth/token", data=form),
+        "user_me": lambda client: client.get(f"{prefix}/user", headers=headers),
+        "user_list": lambda client: client.get(f"{prefix}/user/list?size=50", headers=headers),
+        "role_list": lambda client: client.get(f"{prefix}/role/list", headers=headers),
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, request: Request, requests: int, concurrency: int
+) -> dict[str, float]:
+    for _ in range(WARMUP_REQUESTS):
+        await request(client)
+
+    latencies: list[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal errors, remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await request(client)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 1),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        **{f"{name}_ms": round(value, 3) for name, value in percentiles(latencies).items()},
+    }
+
+
+async def run_all(
+    client: httpx.AsyncClient, email: str, args: argparse.Namespace
+) -> dict[str, dict[str, float]]:
+    response = await client.post(
+        f"{settings.API_PREFIX}/auth/login", json={"email": email, "password": PASSWORD}
+    )
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
+
+    results = {}
+    for name, request in scenarios(email, headers).items():
+        if args.scenario and name not in args.scenario:
+            continue
+        requests = args.auth_requests if name.startswith("auth_") else args.requests
+        results[name] = await run_scenario(client, request, requests, args.concurrency)
+        print(
+            f"{name:<12} {results[name]['throughput_rps']:>9.1f} req/s  "
+            f"p50={results[name]['p50_ms']:.2f}ms  p95={results[name]['p95_ms']:.2f}ms  "
+            f"p99={results[name]['p99_ms']:.2f}ms  errors={results[name]['errors']}",
+            file=sys.stderr,
+        )
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args: argparse.Namespace) -> dict[str, Any]:
+    async with SessionLocal() as session:
+        role = await seed_role(session)
+        rows = await seed_users(session, role, args.users)
+    email = rows[0]["email"]
+
+    try:
+        if args.url:
+            async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+                results = await run_all(client, email, args)
+        else:
+            app = create_application(redis_client_factory=lambda: FakeRedis(decode_responses=True))
+            async with app.router.lifespan_context(app):
+                async with httpx.AsyncClient(
+                    app=app, base_url="http://benchmark", timeout=60
+                ) as client:
+                    results = await run_all(client, email, args)
+    finally:
+        async with SessionLocal() as session:
+            await drop_role(session, role)
+        await engine.dispose()
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "target": args.url or "in-process",
+            "mode": settings.MODE,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "auth_requests": args.auth_requests,
+            "users": args.users,
+        },
+        "scenarios": results,
+    }
+
+
+def compare(baseline_path: str, current_path: str) -> None:
+    """Print the change of every metric between two result files."""
+    with open(baseline_path) as baseline_file, open(current_path) as current_file:
+        baseline, current = json.load(baseline_file), json.load(current_file)
+
+    print(f"{baseline['meta']['commit']} -> {current['meta']['commit']}")
+    for name, metrics in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        changes = "  ".join(
+            f"{metric}={metrics[metric]:g} ({(metrics[metric] / before[metric] - 1) * 100:+.1f}%)"
+            for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+            if before[metric]
+        )
+        print(f"{name:<12} {changes}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1_000)
+    parser.add_argument("--auth-requests", type=int, default=100)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--scenario", action="append", help="Only run these scenarios")
+    parser.add_argument("--url", help="Load a running server instead of an in-process app")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        sys.exit()
+
+    report = json.dumps(asyncio.run(main(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(report + "\n")
+    else:
+        print(report)
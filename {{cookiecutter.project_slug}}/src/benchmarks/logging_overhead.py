@@ -0,0 +1,85 @@
+"""
+Per-request logging overhead for the `app.core.logging.setup` modes.
+
+Every simulated request logs what a real one does: a uvicorn access line
+through the stdlib `InterceptHandler`, an INFO line and a DEBUG line from loguru
+(the DEBUG line is below the file level in the "info" modes). The time spent in
+the request is what a handler pays; with `enqueue` the writes themselves happen
+on loguru's background thread. Logs go to a temporary directory. No Postgres or
+Redis is needed.
+
+Usage:
+    python -m benchmarks.logging_overhead --requests 20000
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from uuid import uuid4
+
+from loguru import logger
+
+from app.core import logging as app_logging
+from benchmarks.common import percentiles
+
+MODES = {
+    "sync debug": {"enqueue": False, "file_level": "DEBUG"},
+    "sync info": {"enqueue": False, "file_level": "INFO"},
+    "enqueue info": {"enqueue": True, "file_level": "INFO"},
+    "enqueue json": {"enqueue": True, "file_level": "INFO", "serialize": True},
+    "enqueue json sampled": {
+        "enqueue": True,
+        "file_level": "INFO",
+        "serialize": True,
+        "access_log_max_qps": 100,
+    },
+}
+
+
+def run(name: str, options: dict, requests: int) -> None:
+    # stderr would measure the terminal rather than the pipeline, log to files only
+    app_logging.setup("benchmark.log", level="CRITICAL", **options)
+    access_logger = logging.getLogger("uvicorn.access")
+    user_id = uuid4()
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(requests):
+        request_start = time.perf_counter()
+        access_logger.info(
+            '%s - "%s %s HTTP/%s" %d', "127.0.0.1:50000", "GET", "/api/v1/user", "1.1", 200
+        )
+        logger.info("User '{}' logged in", user_id)
+        logger.debug("Loaded user {} with role {}", user_id, "admin")
+        latencies.append((time.perf_counter() - request_start) * 1_000_000)
+    elapsed = time.perf_counter() - start
+
+    drain_start = time.perf_counter()
+    logger.remove()
+    drain = time.perf_counter() - drain_start
+
+    quantiles = percentiles(latencies)
+    print(
+        f"{name:<22} {requests / elapsed:>9.0f} req/s  "
+        f"p50={quantiles['p50']:.1f}us  p99={quantiles['p99']:.1f}us  drain={drain:.2f}s"
+    )
+
+
+def main(requests: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            for name, options in MODES.items():
+                run(name, options, requests)
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+    main(args.requests)
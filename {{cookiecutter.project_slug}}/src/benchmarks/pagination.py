@@ -0,0 +1,91 @@
+"""
+Page latency of OFFSET/LIMIT versus keyset (cursor) pagination by page depth.
+
+The cursor for a deep page is built directly from the last row of the
+previous page, so only the page query itself is timed.
+
+Usage:
+    python -m benchmarks.pagination --users 200000 --size 20 --pages 1 10 100 1000 10000
+"""
+
+import argparse
+import asyncio
+import time
+from functools import partial
+
+from sqlmodel import select
+
+from app import crud
+from app.db.session import SessionLocal, engine
+from app.models.user_model import User
+from app.schemas.common_schema import ICursorParams, IOrderEnum
+from app.utils.cursor import Cursor, encode_cursor
+from benchmarks.common import drop_role, percentiles, seed_role, seed_users
+
+
+async def timed(read, repeat: int) -> dict[str, float]:
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await read()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return percentiles(latencies)
+
+
+async def main(users: int, size: int, pages: list[int], repeat: int) -> None:
+    async with SessionLocal() as session:
+        role = await seed_role(session)
+        await seed_users(session, role, users)
+
+    try:
+        async with SessionLocal() as session:
+            print(f"{'page':>8} {'offset p50':>12} {'cursor p50':>12}")
+            for page in pages:
+                skip = (page - 1) * size
+                params = ICursorParams(size=size)
+                if skip:
+                    previous = await session.execute(
+                        select(User.created_at, User.id)
+                        .order_by(User.created_at, User.id)
+                        .offset(skip - 1)
+                        .limit(1)
+                    )
+                    created_at, user_id = previous.one()
+                    params.cursor = encode_cursor(Cursor(value=created_at, id=user_id))
+
+                offset = await timed(
+                    partial(
+                        crud.user.get_multi_ordered,
+                        order_by="created_at",
+                        order=IOrderEnum.ascendent,
+                        skip=skip,
+                        limit=size,
+                        db_session=session,
+                    ),
+                    repeat,
+                )
+                cursor = await timed(
+                    partial(
+                        crud.user.get_multi_cursor_paginated,
+                        params=params,
+                        order_by="created_at",
+                        load_profile="without_role",
+                        db_session=session,
+                    ),
+                    repeat,
+                )
+                print(f"{page:>8} {offset['p50']:>10.2f}ms {cursor['p50']:>10.2f}ms")
+    finally:
+        async with SessionLocal() as session:
+            await drop_role(session, role)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.size, args.pages, args.repeat))
@@ -0,0 +1,135 @@
+"""
+Check that the CRUDBase and CRUDUser queries use an index on a large User table.
+
+Seeds `--users` users and analyzes the tables, then runs each CRUD method
+below and EXPLAINs every SELECT, UPDATE and DELETE it issued, with the same
+parameters. Exits with status 1 when a plan reads "User" with a sequential
+scan, e.g. after a filter or sort column lost its index. Needs Postgres.
+
+Usage:
+    python -m benchmarks.query_plans --users 100000
+"""
+
+import argparse
+import asyncio
+import sys
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import ORMExecuteState
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import crud
+from app.db.explain import explain, plan_nodes, sequential_scans
+from app.db.session import SessionLocal, engine
+from app.models.user_model import User
+from app.schemas.common_schema import ICursorParams, IOrderEnum
+from app.utils.cursor import Cursor, encode_cursor
+from benchmarks.common import drop_role, seed_role, seed_users
+
+Case = Callable[[AsyncSession], Awaitable[Any]]
+
+
+def cases(rows: list[dict], created_at: datetime) -> dict[str, Case]:
+    row, ids = rows[len(rows) // 2], [row["id"] for row in rows[-10:]]
+    cursor = encode_cursor(Cursor(value=created_at, id=row["id"]))
+    ordered = {"order_by": "created_at", "skip": 0, "limit": 50}
+    return {
+        "get": lambda session: crud.user.get(id=row["id"], db_session=session),
+        "get_by_ids": lambda session: crud.user.get_by_ids(list_ids=ids, db_session=session),
+        "get_by_email": lambda session: crud.user.get_by_email(
+            email=row["email"].upper(), load_profile="without_role", db_session=session
+        ),
+        "get_by_username": lambda session: crud.user.get_by_username(
+            username=row["username"], db_session=session
+        ),
+        "get_multi": lambda session: crud.user.get_multi(skip=0, limit=50, db_session=session),
+        "get_multi_ordered asc": lambda session: crud.user.get_multi_ordered(
+            **ordered, order=IOrderEnum.ascendent, db_session=session
+        ),
+        "get_multi_ordered desc": lambda session: crud.user.get_multi_ordered(
+            **ordered, order=IOrderEnum.descendent, db_session=session
+        ),
+        "get_multi_cursor_paginated": lambda session: crud.user.get_multi_cursor_paginated(
+            params=ICursorParams(size=50, cursor=cursor),
+            order_by="created_at",
+            load_profile="without_role",
+            db_session=session,
+        ),
+        "update_many": lambda session: crud.user.update_many(
+            obj_new={"phone": "0"}, ids=ids, db_session=session
+        ),
+        "update_is_active": lambda session: crud.user.update_is_active(
+            db_obj=[User(id=id) for id in ids], obj_in={"is_active": True}, db_session=session
+        ),
+        "remove_many": lambda session: crud.user.remove_many(ids=ids[-2:], db_session=session),
+    }
+
+
+async def check(session: AsyncSession, name: str, case: Case) -> list[str]:
+    statements: list[ORMExecuteState] = []
+
+    def record(state: ORMExecuteState) -> None:
+        if state.is_select or state.is_update or state.is_delete:
+            statements.append(state)
+
+    event.listen(session.sync_session, "do_orm_execute", record)
+    try:
+        await case(session)
+    finally:
+        event.remove(session.sync_session, "do_orm_execute", record)
+
+    failures = []
+    for state in statements:
+        plan = await explain(session, state.statement, params=state.parameters or None)
+        scans = [describe(node) for node in plan_nodes(plan) if "Relation Name" in node]
+        print(f"{name:<28} {', '.join(scans)}")
+        if User.__tablename__ in sequential_scans(plan):
+            failures.append(name)
+    await session.rollback()
+    return failures
+
+
+def describe(node: dict[str, Any]) -> str:
+    scan = f"{node['Node Type']} on {node['Relation Name']}"
+    return f"{scan} using {node['Index Name']}" if "Index Name" in node else scan
+
+
+async def main(users: int) -> int:
+    async with SessionLocal() as session:
+        role = await seed_role(session)
+        rows = await seed_users(session, role, users)
+        # Keyset pages start after the middle row
+        response = await session.execute(
+            select(User.created_at).where(User.id == rows[len(rows) // 2]["id"])
+        )
+        created_at = response.scalar_one()
+    async with engine.connect() as connection:
+        await connection.execute(text('ANALYZE "User", "Role"'))
+        await connection.commit()
+
+    failures = []
+    try:
+        async with SessionLocal() as session:
+            for name, case in cases(rows, created_at).items():
+                failures.extend(await check(session, name, case))
+    finally:
+        async with SessionLocal() as session:
+            await drop_role(session, role)
+        await engine.dispose()
+
+    if failures:
+        print(f"Sequential scans of {User.__tablename__}: {', '.join(failures)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.users)))
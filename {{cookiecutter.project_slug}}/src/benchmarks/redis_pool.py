@@ -0,0 +1,70 @@
+"""
+Compare a Redis client created per request with the shared per-worker pool.
+
+Usage:
+    python -m benchmarks.redis_pool --concurrency 200 --requests 5000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.db.redis_client import close_redis_client, create_redis_client
+
+
+async def per_request_client() -> None:
+    redis_client = await aioredis.from_url(
+        f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}",
+        password=settings.REDIS_PASSWORD,
+        max_connections=10,
+        encoding="utf8",
+        decode_responses=True,
+    )
+    await redis_client.smembers("benchmark:tokens")
+    await redis_client.close()
+    await redis_client.connection_pool.disconnect()
+
+
+async def run(name: str, call, requests: int, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await call()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<12} {requests / elapsed:>10.0f} req/s  "
+        f"p50={quantiles[49]:.2f}ms  p95={quantiles[94]:.2f}ms  p99={quantiles[98]:.2f}ms"
+    )
+
+
+async def main(requests: int, concurrency: int) -> None:
+    await run("per-request", per_request_client, requests, concurrency)
+
+    shared = create_redis_client()
+    try:
+        await run(
+            "shared-pool", lambda: shared.smembers("benchmark:tokens"), requests, concurrency
+        )
+    finally:
+        await close_redis_client(shared)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,108 @@
+"""
+Register throughput and correctness under parallel duplicate signups.
+
+Sends `--duplicates` concurrent `/auth/register` requests for each of
+`--signups` identities (the copies vary the email case), with at most
+`--concurrency` requests in flight. Exactly one request per identity must be
+created (201) and the others rejected with a 409; anything else, such as a 500
+from a race between a uniqueness check and the INSERT, is counted as an error.
+The app runs in-process against the configured Postgres with fakeredis, as in
+`benchmarks.load`. Every request pays a bcrypt hash, so keep `--signups` low.
+
+Usage:
+    python -m benchmarks.register --signups 25 --duplicates 4 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+from uuid import uuid4
+
+import httpx
+from fakeredis.aioredis import FakeRedis
+from sqlmodel import func, select
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.main import create_application
+from app.models.user_model import User
+from benchmarks.common import PASSWORD, percentiles
+
+
+async def main(signups: int, duplicates: int, concurrency: int) -> int:
+    run = uuid4().hex[:8]
+    identities = [
+        (f"register-{run}-{index}@example.com", f"register-{run}-{index}")
+        for index in range(signups)
+    ]
+    # Copies of one identity are adjacent, so they race each other
+    bodies = [
+        {"email": email.upper() if copy % 2 else email, "username": username, "password": PASSWORD}
+        for email, username in identities
+        for copy in range(duplicates)
+    ]
+
+    app = create_application(redis_client_factory=lambda: FakeRedis(decode_responses=True))
+    statuses: dict[str, Counter] = {username: Counter() for _, username in identities}
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def register(client: httpx.AsyncClient, body: dict[str, str]) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(f"{settings.API_PREFIX}/auth/register", json=body)
+            latencies.append((time.perf_counter() - start) * 1000)
+        statuses[body["username"]][response.status_code] += 1
+
+    try:
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(
+                app=app, base_url="http://benchmark", timeout=300
+            ) as client:
+                start = time.perf_counter()
+                await asyncio.gather(*(register(client, body) for body in bodies))
+                elapsed = time.perf_counter() - start
+
+        async with SessionLocal() as session:
+            response = await session.execute(
+                select(func.count())
+                .select_from(User)
+                .where(User.username.like(f"register-{run}-%"))
+            )
+            stored = response.scalar_one()
+    finally:
+        async with SessionLocal() as session:
+            await session.execute(
+                User.__table__.delete().where(User.username.like(f"register-{run}-%"))
+            )
+            await session.commit()
+        await engine.dispose()
+
+    totals = sum(statuses.values(), Counter())
+    wrong = [
+        username
+        for username, counts in statuses.items()
+        if counts[201] != 1 or counts[409] != duplicates - 1
+    ]
+    quantiles = percentiles(latencies)
+    print(
+        f"{len(bodies)} requests in {elapsed:.1f}s, {len(bodies) / elapsed:.1f} req/s  "
+        f"p50={quantiles['p50']:.0f}ms  p99={quantiles['p99']:.0f}ms\n"
+        f"statuses {dict(sorted(totals.items()))}, {stored} users stored for {signups} identities"
+    )
+    if wrong or stored != signups:
+        print(f"{len(wrong)} identities were not created exactly once", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--signups", type=int, default=25)
+    parser.add_argument("--duplicates", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.signups, args.duplicates, args.concurrency)))
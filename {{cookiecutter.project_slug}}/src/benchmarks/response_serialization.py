@@ -0,0 +1,83 @@
+"""
+Latency of `/user/list?size=100` with FastAPI's default JSONResponse versus
+FastJSONResponse/FastJSONRoute.
+
+Both apps are served in-process through httpx, so the numbers isolate
+validation and serialization from network overhead. Needs Postgres and Redis.
+
+Usage:
+    python -m benchmarks.response_serialization --requests 500
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
+
+from app.api.responses import FastJSONResponse
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.main import create_application
+from benchmarks.common import PASSWORD, drop_role, percentiles, seed_role, seed_users
+
+LIST_URL = f"{settings.API_PREFIX}/user/list?size=100"
+
+
+async def run(
+    name: str, response_class: type[Response], email: str, requests: int
+) -> tuple[float, dict]:
+    app: FastAPI = create_application(default_response_class=response_class)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(app=app, base_url="http://benchmark") as client:
+            response = await client.post(
+                f"{settings.API_PREFIX}/auth/login", json={"email": email, "password": PASSWORD}
+            )
+            headers = {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
+            body = (await client.get(LIST_URL, headers=headers)).json()
+
+            latencies = []
+            start = time.perf_counter()
+            for _ in range(requests):
+                request_start = time.perf_counter()
+                response = await client.get(LIST_URL, headers=headers)
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - request_start) * 1000)
+            elapsed = time.perf_counter() - start
+
+    quantiles = percentiles(latencies)
+    print(
+        f"{name:<18} {requests / elapsed:>8.0f} req/s  "
+        f"p50={quantiles['p50']:.2f}ms  p99={quantiles['p99']:.2f}ms"
+    )
+    return quantiles["p50"], body
+
+
+async def main(requests: int) -> None:
+    async with SessionLocal() as session:
+        role = await seed_role(session)
+        rows = await seed_users(session, role, 200)
+
+    try:
+        default_p50, default_body = await run(
+            "JSONResponse", JSONResponse, rows[0]["email"], requests
+        )
+        fast_p50, fast_body = await run(
+            "FastJSONResponse", FastJSONResponse, rows[0]["email"], requests
+        )
+    finally:
+        async with SessionLocal() as session:
+            await drop_role(session, role)
+        await engine.dispose()
+
+    assert default_body == fast_body, "Response bodies differ"
+    print(f"p50 speedup: {default_p50 / fast_p50:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,182 @@
+"""
+Throughput of the production gunicorn profile from 1 to N workers.
+
+For each worker count, starts `gunicorn app.asgi:app -c gunicorn.conf.py` on a
+local port with WEB_CONCURRENCY set, then loads `--path` for `--duration`
+seconds from `--client-processes` processes of `--concurrency` connections
+each, and reports throughput and latency. The load generator shares the
+machine with the server, so give it spare cores (or keep `--workers` below the
+CPU count) for the scaling to show. Needs the configured Postgres and Redis,
+the workers are separate processes so fakeredis cannot stand in for Redis.
+
+Usage:
+    python -m benchmarks.server_scaling --workers 1,2,4 --duration 15
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from benchmarks.common import PASSWORD, drop_role, percentiles, seed_role, seed_users
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int, env: dict[str, str]) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app.asgi:app", "-c", "gunicorn.conf.py"]
+        + ["--bind", f"127.0.0.1:{port}"],
+        env={**env, "WEB_CONCURRENCY": str(workers)},
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/openapi.json").status_code == 200:
+                return server
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"gunicorn with {workers} workers did not start")
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    # SIGTERM, as in production: gunicorn drains the workers before exiting
+    server.send_signal(signal.SIGTERM)
+    server.wait(timeout=60)
+
+
+async def drive(
+    url: str, headers: dict[str, str], concurrency: int, duration: float
+) -> tuple[list[float], int]:
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=30) as client:
+
+        async def worker() -> None:
+            nonlocal errors
+            while (start := time.perf_counter()) < deadline:
+                response = await client.get(url)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.status_code >= 400:
+                    errors += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors
+
+
+def client_process(args: tuple[str, dict[str, str], int, float]) -> tuple[list[float], int]:
+    return asyncio.run(drive(*args))
+
+
+def measure(
+    workers: int, env: dict[str, str], email: str, args: argparse.Namespace
+) -> dict[str, float]:
+    port = free_port()
+    server = start_server(workers, port, env)
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        response = httpx.post(
+            f"{base_url}{settings.API_PREFIX}/auth/login",
+            json={"email": email, "password": PASSWORD},
+            timeout=30,
+        )
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
+        url = f"{base_url}{settings.API_PREFIX}{args.path}"
+
+        # Warm every worker's caches before measuring
+        client_process((url, headers, args.concurrency, 2))
+        with multiprocessing.Pool(args.client_processes) as pool:
+            results = pool.map(
+                client_process,
+                [(url, headers, args.concurrency, args.duration)] * args.client_processes,
+            )
+    finally:
+        stop_server(server)
+
+    latencies = [latency for process_latencies, _ in results for latency in process_latencies]
+    quantiles = percentiles(latencies)
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in results),
+        "throughput_rps": round(len(latencies) / args.duration, 1),
+        **{f"{name}_ms": round(value, 3) for name, value in quantiles.items()},
+    }
+
+
+async def seed(users: int):
+    async with SessionLocal() as session:
+        role = await seed_role(session)
+        rows = await seed_users(session, role, users)
+    await engine.dispose()
+    return role, rows[0]["email"]
+
+
+async def cleanup(role) -> None:
+    async with SessionLocal() as session:
+        await drop_role(session, role)
+    await engine.dispose()
+
+
+def main(args: argparse.Namespace) -> list[dict[str, float]]:
+    env = {**os.environ, "MODE": "production", "LOG_LEVEL": "WARNING", "LOG_ENQUEUE": "true"}
+
+    role, email = asyncio.run(seed(args.users))
+    results = []
+    try:
+        for workers in args.workers:
+            results.append(measure(workers, env, email, args))
+            result = results[-1]
+            print(
+                f"workers={workers:<3} {result['throughput_rps']:>9.1f} req/s  "
+                f"speedup={result['throughput_rps'] / results[0]['throughput_rps']:.2f}x  "
+                f"p50={result['p50_ms']:.2f}ms  p99={result['p99_ms']:.2f}ms  "
+                f"errors={result['errors']}",
+                file=sys.stderr,
+            )
+    finally:
+        asyncio.run(cleanup(role))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--workers",
+        type=lambda value: [int(workers) for workers in value.split(",")],
+        default=[1, 2, 4],
+    )
+    parser.add_argument("--path", default="/user")
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--client-processes", type=int, default=2)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    report = json.dumps(main(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(report + "\n")
+    else:
+        print(report)
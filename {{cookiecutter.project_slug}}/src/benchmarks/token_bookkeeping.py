@@ -0,0 +1,122 @@
+"""
+Latency breakdown of the Redis token bookkeeping done by the auth endpoints,
+sequential commands (previous flow) versus one script call per endpoint, with
+the Redis round trips each flow makes.
+
+Usage:
+    python -m benchmarks.token_bookkeeping --iterations 2000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import timedelta
+from uuid import uuid4
+
+from redis.asyncio import Redis
+
+from app.db.redis_client import close_redis_client, create_redis_client
+from app.schemas.common_schema import TokenType
+from app.utils.token import store_tokens
+
+EXPIRE = timedelta(minutes=30)
+
+
+class CountingRedis(Redis):
+    """`Redis` counting the commands it sends, one round trip each."""
+
+    commands = 0
+
+    async def execute_command(self, *args, **options):
+        self.commands += 1
+        return await super().execute_command(*args, **options)
+
+
+async def sequential_add(redis_client: Redis, key: str, token: str) -> None:
+    valid_tokens = await redis_client.smembers(key)
+    await redis_client.sadd(key, token)
+    if not valid_tokens:
+        await redis_client.expire(key, EXPIRE)
+
+
+async def sequential_login(redis_client: Redis, user_id: str) -> None:
+    for token_type in TokenType:
+        key = f"legacy:{user_id}:{token_type.value}"
+        if await redis_client.smembers(key):
+            await sequential_add(redis_client, key, uuid4().hex)
+
+
+async def sequential_change_password(redis_client: Redis, user_id: str) -> None:
+    for token_type in TokenType:
+        key = f"legacy:{user_id}:{token_type.value}"
+        if await redis_client.smembers(key) is not None:
+            await redis_client.delete(key)
+    for token_type in TokenType:
+        await sequential_add(redis_client, f"legacy:{user_id}:{token_type.value}", uuid4().hex)
+
+
+async def scripted_login(redis_client: Redis, user_id: str) -> None:
+    tokens = {token_type: uuid4().hex for token_type in TokenType}
+    await store_tokens(redis_client, user_id, tokens, only_if_tracked=True)
+
+
+async def scripted_change_password(redis_client: Redis, user_id: str) -> None:
+    tokens = {token_type: uuid4().hex for token_type in TokenType}
+    await store_tokens(redis_client, user_id, tokens, replace=True)
+
+
+async def measure(
+    name: str, flow, redis_client: CountingRedis, user_id: str, iterations: int
+) -> None:
+    latencies = []
+    commands = redis_client.commands
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await flow(redis_client, user_id)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    round_trips = (redis_client.commands - commands) / iterations
+    print(
+        f"{name:<28} p50={quantiles[49]:.3f}ms  p99={quantiles[98]:.3f}ms"
+        f"  round trips={round_trips:.1f}"
+    )
+
+
+async def main(iterations: int) -> None:
+    redis_client = CountingRedis(connection_pool=create_redis_client().connection_pool)
+    user_id = str(uuid4())
+    try:
+        # Both layouts start with tracked tokens, the worst case for login
+        await sequential_change_password(redis_client, user_id)
+        await scripted_change_password(redis_client, user_id)
+
+        await measure("login (sequential)", sequential_login, redis_client, user_id, iterations)
+        await measure("login (script)", scripted_login, redis_client, user_id, iterations)
+        await measure(
+            "change-password (sequential)",
+            sequential_change_password,
+            redis_client,
+            user_id,
+            iterations,
+        )
+        await measure(
+            "change-password (script)",
+            scripted_change_password,
+            redis_client,
+            user_id,
+            iterations,
+        )
+    finally:
+        keys = [f"legacy:{user_id}:{token_type.value}" for token_type in TokenType]
+        keys += [f"tokens:{user_id}:{token_type.value}" for token_type in TokenType]
+        await redis_client.delete(*keys)
+        await close_redis_client(redis_client)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
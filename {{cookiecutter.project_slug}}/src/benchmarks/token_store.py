@@ -0,0 +1,77 @@
+"""
+Compare the legacy token set (SMEMBERS + membership in Python) with the sorted
+set token store (single ZSCORE in a script) for memory and check latency.
+
+Usage:
+    python -m benchmarks.token_store --tokens 1000 --checks 2000
+"""
+
+import argparse
+import asyncio
+import secrets
+import statistics
+import time
+from uuid import uuid4
+
+from app.db.redis_client import close_redis_client, create_redis_client
+from app.schemas.common_schema import TokenType
+from app.utils.token import get_token_key, is_token_valid
+
+
+async def measure(call, checks: int) -> list[float]:
+    latencies = []
+    for _ in range(checks):
+        start = time.perf_counter()
+        await call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(name: str, memory: int, latencies: list[float]) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<8} memory={memory / 1024:>9.1f}KiB  "
+        f"p50={quantiles[49]:.3f}ms  p99={quantiles[98]:.3f}ms"
+    )
+
+
+async def main(tokens: int, checks: int) -> None:
+    redis_client = create_redis_client()
+    user_id = uuid4()
+    legacy_key = f"user:{user_id}:{TokenType.ACCESS}"
+    token_key = get_token_key(user_id, TokenType.ACCESS)
+    members = [secrets.token_urlsafe(160) for _ in range(tokens)]
+    expires_at = time.time() + 3600
+    probe = members[-1]
+
+    try:
+        await redis_client.sadd(legacy_key, *members)
+        await redis_client.zadd(token_key, {member: expires_at for member in members})
+
+        async def legacy_check() -> bool:
+            return probe in await redis_client.smembers(legacy_key)
+
+        async def sorted_set_check() -> bool:
+            return await is_token_valid(redis_client, user_id, probe, TokenType.ACCESS)
+
+        report(
+            "legacy",
+            await redis_client.memory_usage(legacy_key, samples=0),
+            await measure(legacy_check, checks),
+        )
+        report(
+            "zset",
+            await redis_client.memory_usage(token_key, samples=0),
+            await measure(sorted_set_check, checks),
+        )
+    finally:
+        await redis_client.delete(legacy_key, token_key)
+        await close_redis_client(redis_client)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=1000)
+    parser.add_argument("--checks", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.tokens, args.checks))
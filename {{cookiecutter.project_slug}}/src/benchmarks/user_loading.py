@@ -0,0 +1,89 @@
+"""
+Regression check for relationship loading on the `/user` hot path.
+
+Seeds one role with many users, then counts the statements issued and the
+objects loaded by the CRUD reads behind `get_current_user` and
+`get_general_meta`. Exits with status 1 when a read loads more objects than
+its budget.
+
+Usage:
+    python -m benchmarks.user_loading --users 100000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from uuid import UUID
+
+from sqlalchemy import event
+
+from app import crud
+from app.db.session import SessionLocal, engine
+from app.models.role_model import Role
+from benchmarks.common import drop_role, seed_role, seed_users
+
+
+async def seed(users: int) -> tuple[Role, UUID]:
+    async with SessionLocal() as session:
+        role = await seed_role(session)
+        rows = await seed_users(session, role, users)
+        return role, rows[0]["id"]
+
+
+async def measure(name: str, read, budget: int) -> bool:
+    statements = 0
+
+    def count_statement(*args) -> None:
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+    try:
+        async with SessionLocal() as session:
+            start = time.perf_counter()
+            result = await read(session)  # noqa: F841 keeps loaded objects referenced
+            elapsed = (time.perf_counter() - start) * 1000
+            loaded = len(session.identity_map)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count_statement)
+
+    status = "ok" if loaded <= budget else "OVER BUDGET"
+    print(
+        f"{name:<32} statements={statements}  objects={loaded:<8} "
+        f"budget={budget:<4} {elapsed:>9.2f}ms  {status}"
+    )
+    return loaded <= budget
+
+
+async def main(users: int) -> None:
+    role, user_id = await seed(users)
+    try:
+        results = [
+            await measure(
+                "crud.user.get (with_role)",
+                lambda session: crud.user.get(
+                    id=user_id, load_profile="with_role", db_session=session
+                ),
+                budget=2,
+            ),
+            await measure(
+                "crud.role.get_multi",
+                lambda session: crud.role.get_multi(limit=100, db_session=session),
+                budget=100,
+            ),
+        ]
+    finally:
+        async with SessionLocal() as session:
+            await drop_role(session, role)
+        await engine.dispose()
+
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.users))
@@ -0,0 +1,66 @@
+"""
+Cost of generating primary keys with `app.utils.uuid6`.
+
+Compares uuid7() returning the module's UUID class or a plain `uuid.UUID`,
+uuid7_batch() per id, the standard library uuid4(), and the former uuid7 path
+(`secrets.randbits` and the checked `UUID(int=..., version=7)` constructor per
+id) for reference. No Postgres or Redis is needed.
+
+Usage:
+    python -m benchmarks.uuid_generation --ids 200000
+"""
+
+import argparse
+import secrets
+import time
+import uuid
+
+from app.utils.uuid6 import UUID, uuid7, uuid7_batch
+
+
+def former_uuid7() -> UUID:
+    timestamp_ms, timestamp_ns = divmod(time.time_ns(), 10**6)
+    subsec = timestamp_ns * 2**20 // 10**6
+    uuid_int = (timestamp_ms & 0xFFFFFFFFFFFF) << 80
+    uuid_int |= (subsec >> 8) << 64
+    uuid_int |= (subsec & 0xFF) << 54
+    uuid_int |= secrets.randbits(54)
+    return UUID(int=uuid_int, version=7)
+
+
+def per_id(generate, ids: int) -> float:
+    start = time.perf_counter()
+    for _ in range(ids):
+        generate()
+    return (time.perf_counter() - start) / ids
+
+
+def batched(batch_size: int, ids: int) -> float:
+    start = time.perf_counter()
+    for _ in range(ids // batch_size):
+        uuid7_batch(batch_size)
+    return (time.perf_counter() - start) / (ids // batch_size * batch_size)
+
+
+def main(ids: int, batch_size: int, repeat: int) -> None:
+    cases = {
+        "uuid4": lambda: per_id(uuid.uuid4, ids),
+        "former uuid7": lambda: per_id(former_uuid7, ids),
+        "uuid7": lambda: per_id(uuid7, ids),
+        "uuid7 plain UUID": lambda: per_id(lambda: uuid7(uuid.UUID), ids),
+        f"uuid7_batch({batch_size})": lambda: batched(batch_size, ids),
+    }
+    print(f"{'generator':<22} {'ns/id':>8}")
+    for name, run in cases.items():
+        seconds = min(run() for _ in range(repeat))
+        print(f"{name:<22} {seconds * 1e9:>8.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ids", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    main(args.ids, args.batch_size, args.repeat)
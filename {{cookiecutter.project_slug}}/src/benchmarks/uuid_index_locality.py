@@ -0,0 +1,91 @@
+"""
+Insert throughput and primary key index size with uuid7 versus uuid4 ids.
+
+Inserts `--rows` rows in batches of `--batch-size` into a scratch table with a
+uuid primary key, once with uuid7 ids and once with uuid4 ids. Time-ordered
+ids always land on the rightmost B-tree leaf, random ones on any leaf, so
+uuid4 splits pages all over the index, dirties more buffers and leaves the
+leaves half full. Reports rows per second, the index size and, when the
+pgstattuple extension is available, the average leaf density. Needs Postgres.
+
+Usage:
+    python -m benchmarks.uuid_index_locality --rows 1000000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.db.session import engine
+from app.utils.uuid6 import uuid7_batch
+
+TABLE = "benchmark_uuid_locality"
+
+
+def uuid4_batch(count: int, uuid_class: type[uuid.UUID] = uuid.UUID) -> list[uuid.UUID]:
+    return [uuid.uuid4() for _ in range(count)]
+
+
+async def leaf_density(connection) -> float | None:
+    try:
+        async with connection.begin_nested():
+            result = await connection.execute(
+                text(f"SELECT avg_leaf_density FROM pgstatindex('{TABLE}_pkey')")
+            )
+            return result.scalar_one()
+    except DBAPIError:
+        return None
+
+
+async def measure(generate, rows: int, batch_size: int) -> dict[str, float | None]:
+    async with engine.begin() as connection:
+        await connection.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        await connection.execute(
+            text(f"CREATE TABLE {TABLE} (id uuid PRIMARY KEY, created_at timestamptz)")
+        )
+
+    insert = text(
+        f"INSERT INTO {TABLE} (id, created_at) SELECT unnest(CAST(:ids AS uuid[])), now()"
+    )
+    try:
+        start = time.perf_counter()
+        for _ in range(rows // batch_size):
+            async with engine.begin() as connection:
+                await connection.execute(insert, {"ids": generate(batch_size, uuid.UUID)})
+        elapsed = time.perf_counter() - start
+
+        async with engine.begin() as connection:
+            index_size = await connection.execute(text(f"SELECT pg_relation_size('{TABLE}_pkey')"))
+            return {
+                "rows_per_second": rows // batch_size * batch_size / elapsed,
+                "index_mb": index_size.scalar_one() / 2**20,
+                "leaf_density": await leaf_density(connection),
+            }
+    finally:
+        async with engine.begin() as connection:
+            await connection.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+
+
+async def main(rows: int, batch_size: int) -> None:
+    print(f"{'ids':<6} {'rows/s':>10} {'index MB':>10} {'leaf density':>13}")
+    for name, generate in (("uuid7", uuid7_batch), ("uuid4", uuid4_batch)):
+        result = await measure(generate, rows, batch_size)
+        density = result["leaf_density"]
+        print(
+            f"{name:<6} {result['rows_per_second']:>10.0f} {result['index_mb']:>10.1f} "
+            f"{f'{density:.1f}%' if density is not None else 'n/a':>13}"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows, args.batch_size))
@@ -0,0 +1,141 @@
+"""
+Check that the single-row CRUD writes run exactly one SQL statement.
+
+Runs each write below inside `track_queries` and counts the statements sent to
+Postgres, e.g. a `refresh` after the commit would show up as a second SELECT.
+The written objects must still hold the stored values afterwards. Exits with
+status 1 when a write runs more or fewer statements. Needs Postgres.
+
+Usage:
+    python -m benchmarks.write_queries
+"""
+
+import asyncio
+import sys
+from collections.abc import Awaitable, Callable
+from typing import Any
+from uuid import uuid4
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import crud
+from app.core.query_audit import track_queries
+from app.db.session import SessionLocal, engine
+from app.models.role_model import Role
+from app.models.user_model import User
+from app.schemas.role_schema import IRoleCreate
+from app.schemas.user_schema import IUserCreate
+from app.utils.role_catalog import role_catalog
+from benchmarks.common import PASSWORD, drop_role, seed_role
+
+Write = Callable[[AsyncSession], Awaitable[Any]]
+
+
+def writes(role: Role, user: User, suffix: str) -> dict[str, Write]:
+    return {
+        "role create": lambda session: crud.role.create(
+            obj_in=IRoleCreate(name=f"{role.name}-new", description="New"), db_session=session
+        ),
+        "role update": lambda session: crud.role.update(
+            obj_current=role, obj_new={"description": "Updated"}, db_session=session
+        ),
+        "role update_by_id": lambda session: crud.role.update_by_id(
+            id=role.id, obj_new={"description": "Updated again"}, db_session=session
+        ),
+        "user create": lambda session: crud.user.create(
+            obj_in=User(
+                first_name="Write",
+                last_name="Check",
+                email=f"create-{suffix}@example.com",
+                username=f"create-{suffix}",
+                hashed_password="-",
+                role_id=role.id,
+            ),
+            db_session=session,
+        ),
+        "user create_with_role": lambda session: crud.user.create_with_role(
+            obj_in=IUserCreate(
+                first_name="Write",
+                last_name="Check",
+                email=f"with-role-{suffix}@example.com",
+                username=f"with-role-{suffix}",
+                password=PASSWORD,
+                role_id=role.id,
+            ),
+            db_session=session,
+        ),
+        "user update": lambda session: crud.user.update(
+            obj_current=user, obj_new={"phone": "0"}, db_session=session
+        ),
+        "user update_by_id": lambda session: crud.user.update_by_id(
+            id=user.id, obj_new={"phone": "1"}, db_session=session
+        ),
+    }
+
+
+async def main() -> int:
+    # Role lookups of the writes come from the catalog, as in the app
+    await role_catalog.load()
+    suffix = uuid4().hex[:8]
+    async with SessionLocal() as session:
+        role = await seed_role(session)
+        user = await crud.user.create(
+            obj_in=User(
+                first_name="Write",
+                last_name="Check",
+                email=f"{suffix}@example.com",
+                username=f"user-{suffix}",
+                hashed_password="-",
+            ),
+            db_session=session,
+        )
+    await role_catalog.load()
+
+    failures = []
+    try:
+        async with SessionLocal() as session:
+            for name, write in writes(role, user, suffix).items():
+                with track_queries() as log:
+                    obj = await write(session)
+                print(f"{name:<24} {len(log)} statement(s)")
+                for query in log.queries:
+                    print(f"    {query.fingerprint[:100]}")
+                if len(log) != 1 or obj.id is None or obj.updated_at is None:
+                    failures.append(name)
+
+            # `crud.user.update` merged the detached user, use the session's copy
+            user = await session.merge(user, load=False)
+            with track_queries() as log:
+                await crud.role.add_role_to_user(user=user, role_id=role.id, db_session=session)
+            print(f"{'role add_role_to_user':<24} {len(log)} statement(s)")
+            if len(log) != 1 or user.role_id != role.id:
+                failures.append("role add_role_to_user")
+
+            # The role still has users, its foreign key unsets their role_id
+            with track_queries() as log:
+                await crud.role.remove(id=role.id, db_session=session)
+            print(f"{'role remove':<24} {len(log)} statement(s)")
+            if len(log) != 1:
+                failures.append("role remove")
+
+            with track_queries() as log:
+                await crud.user.remove(id=user.id, db_session=session)
+            print(f"{'user remove':<24} {len(log)} statement(s)")
+            if len(log) != 1:
+                failures.append("user remove")
+    finally:
+        async with SessionLocal() as session:
+            await session.execute(User.__table__.delete().where(User.username.like(f"%{suffix}")))
+            await session.execute(Role.__table__.delete().where(Role.name == f"{role.name}-new"))
+            await session.commit()
+            await drop_role(session, role)
+        await engine.dispose()
+
+    if failures:
+        print(f"Not exactly one statement: {', '.join(failures)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
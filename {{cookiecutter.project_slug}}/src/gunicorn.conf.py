@@ -0,0 +1,66 @@
+"""
+Gunicorn settings of the production server.
+
+One uvicorn worker per available CPU unless WEB_CONCURRENCY is set. The worker
+count is exported as WEB_CONCURRENCY before the workers start, so each of them
+sizes its DB and Redis pools as its share of DB_MAX_CONNECTIONS and
+REDIS_MAX_CONNECTIONS (see `app.core.config.Settings`).
+
+Usage:
+    gunicorn app.asgi:app -c gunicorn.conf.py
+"""
+
+import math
+import os
+import shutil
+
+
+def available_cpus() -> int:
+    """CPUs the process may run on, capped by the cgroup v2 quota of the container."""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(cpus, 1)
+
+
+workers = int(os.environ.get("WEB_CONCURRENCY") or available_cpus())
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+# Workers load the app themselves, so no connection is shared across a fork
+preload_app = False
+
+# Recycle workers to bound slow leaks; the jitter keeps them from restarting together
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 10_000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 1_000))
+
+# On SIGTERM workers stop accepting connections, finish in-flight requests and
+# run the app's shutdown; they are killed after `graceful_timeout` seconds
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+
+def on_starting(server) -> None:
+    # Metrics of previous runs would be aggregated into `/metrics` otherwise
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir)
+
+
+def child_exit(server, worker) -> None:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)